@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+pytest 共通設定。
+語彙全体を走査する analyze_token_categories の結果をディスクにキャッシュし、
+テストの再実行時や pytest-xdist の各ワーカー間で解析をやり直さずに済むようにします。
+"""
+
+import os
+import pickle
+import hashlib
+import logging
+import pytest
+import token_analyzer_ja
+
+
+@pytest.fixture(scope="session")
+def cached_analysis(request):
+    """
+    (model_id, min_token_id, token_analyzer_ja.py の更新時刻) をキーに解析結果を
+    pytest のキャッシュディレクトリへ pickle 保存し、保存済みであればそれを読み込んで返す関数を提供する。
+    解析ロジックを編集するとキーが変わるため、古い結果が使われることはない。
+    """
+    cache_dir = request.config.cache.mkdir("token_analysis")
+
+    def load(model_id, min_token_id):
+        analyzer_mtime = os.path.getmtime(token_analyzer_ja.__file__)
+        key = hashlib.sha1(
+            f"{model_id}|{min_token_id}|{analyzer_mtime}".encode("utf-8")
+        ).hexdigest()
+        cache_path = cache_dir / f"{key}.pkl"
+        if cache_path.exists():
+            logging.info("キャッシュ済みの解析結果を使用します: %s", cache_path)
+            return pickle.loads(cache_path.read_bytes())
+
+        result = token_analyzer_ja.analyze_token_categories(
+            model_id, min_token_id=min_token_id
+        )
+        # 解析失敗時の空結果はキャッシュしない
+        if result:
+            # 他ワーカーが書き込み途中のファイルを読まないよう、一時ファイル経由で置き換える
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(tmp_path, cache_path)
+        return result
+
+    return load
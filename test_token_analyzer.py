@@ -0,0 +1,1418 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+import logging
+import functools
+import collections
+import io
+import os
+import re
+import json
+import pickle
+import sys
+import random  # サンプル抽出に使用
+import numpy as np
+import pytest
+import token_analyzer_ja
+from token_analyzer_ja import (
+    # 利用するヘルパー関数
+    is_japanese_related_char,
+    is_pure_japanese_script_char,
+    is_special_char_pattern,
+    # トークナイザーのロード (解析側とキャッシュを共有)
+    load_tokenizer,
+    # 定義された文字セット（分類ロジック再現のため）
+    HIRAGANA,
+    KATAKANA,
+    KATAKANA_HW,
+    KANJI_COMMON,
+    KANJI_EXT_A,
+    KANJI_EXT_B_TO_F,
+    KANJI_COMPAT,
+    JP_PUNCT,
+    JP_SYMBOLS_ETC,
+    JP_FULLWIDTH_ASCII_PRINTABLE,
+)
+
+# テスト実行中のログレベル設定 (必要に応じて変更)
+# logging.disable(logging.CRITICAL) # ログを抑制する場合
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)  # INFOレベル以上を表示
+# 検証ごとの詳細出力は DEBUG レベル (--log-level=DEBUG などで表示)
+logger = logging.getLogger(__name__)
+
+# --- 定数 ---
+TARGET_MODEL_ID = "unsloth/Llama-4-Scout-17B-16E-Instruct"
+MIN_TEST_TOKEN_ID = 102
+MAX_SAMPLES_PER_CATEGORY = 5
+TOTAL_SAMPLES_FOR_LOGIC_TEST = 50
+# サンプリング用の乱数シード (毎回同じトークンIDを検証し、失敗を再現できるようにする)
+SAMPLE_SEED = 0x4A50
+
+# 分析結果のカテゴリ名と、トークンIDごとのカテゴリビットマスク (cat_mask) 上のビット
+CATEGORY_NAMES = [
+    "contains_japanese",
+    "pure_japanese_script",
+    "pure_english",
+    "contains_hiragana",
+    "contains_katakana_full",
+    "contains_katakana_half",
+    "contains_kanji",
+    "contains_jp_punct_symbol",
+    "contains_fullwidth_ascii",
+    "contains_basic_english",
+    "contains_digit",
+    "special_char_pattern",
+    "uncategorized",
+]
+CATEGORY_BITS = {name: 1 << i for i, name in enumerate(CATEGORY_NAMES)}
+# uncategorized 以外の全カテゴリのビットの和
+DEFINED_CATEGORY_BITS = sum(
+    bit for name, bit in CATEGORY_BITS.items() if name != "uncategorized"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _categories_from_mask(mask):
+    """カテゴリビットマスクをカテゴリ名の frozenset に変換する (実際に現れるマスクの種類は少ないためキャッシュする)"""
+    return frozenset(name for name, bit in CATEGORY_BITS.items() if mask & bit)
+
+
+# --- 特殊文字パターン判定の高速版 (正規表現) ---
+def _build_char_class(chars):
+    """文字集合を連続範囲にまとめ、正規表現の文字クラス本体 (角括弧の内側) を生成する"""
+    cps = sorted(ord(c) for c in chars)
+    parts = []
+    start = prev = cps[0]
+    for cp in cps[1:] + [None]:
+        if cp is not None and cp == prev + 1:
+            prev = cp
+            continue
+        if start == prev:
+            parts.append(re.escape(chr(start)))
+        else:
+            parts.append(f"{re.escape(chr(start))}-{re.escape(chr(prev))}")
+        if cp is not None:
+            start = prev = cp
+    return "".join(parts)
+
+
+# is_special_char_pattern が「特殊文字ではない」とみなす文字のいずれかにマッチする。
+# [^\W_] は str.isalnum()、\s は str.isspace() と同じ判定 (英語基本文字も isalnum に含まれる)。
+_NON_SPECIAL = re.compile(
+    r"[^\W_]|\s|["
+    + _build_char_class(
+        HIRAGANA
+        | KATAKANA
+        | KATAKANA_HW
+        | KANJI_COMMON
+        | KANJI_EXT_A
+        | KANJI_EXT_B_TO_F
+        | KANJI_COMPAT
+        | JP_PUNCT
+        | JP_SYMBOLS_ETC
+        | JP_FULLWIDTH_ASCII_PRINTABLE
+    )
+    + "]"
+)
+
+
+# ASCII (U+0000～U+007F) のうち isalnum() でも isspace() でもない文字の表 (日本語文字はASCIIに含まれない)
+_ASCII_SPECIAL_CHARS = "".join(
+    chr(i) for i in range(128) if not (chr(i).isalnum() or chr(i).isspace())
+)
+
+
+def _is_special_fast(token):
+    """is_special_char_pattern と同じ判定を、Pythonの文字ループではなく正規表現エンジン (C実装) で行う"""
+    if token.isascii():
+        # ASCIIのみのトークンは、全文字が上の表に含まれるか (strip で空になるか) だけで判定できる
+        return bool(token) and not token.strip(_ASCII_SPECIAL_CHARS)
+    return _NON_SPECIAL.search(token) is None
+
+
+# --- コードポイント → 文字種ビットマスクの変換表 ---
+_BIT_HIRAGANA = 1 << 0
+_BIT_KATAKANA_FULL = 1 << 1
+_BIT_KATAKANA_HALF = 1 << 2
+_BIT_KANJI = 1 << 3
+_BIT_JP_PUNCT_SYMBOL = 1 << 4
+_BIT_FULLWIDTH_ASCII = 1 << 5
+_BIT_BASIC_ENGLISH = 1 << 6
+_BIT_DIGIT = 1 << 7
+_BIT_JP_RELATED = 1 << 8
+_BIT_PURE_JP = 1 << 9
+# is_special_char_pattern が特殊文字とみなさない文字 (英数字・空白・日本語関連文字)
+_BIT_NON_SPECIAL = 1 << 10
+
+
+def _build_char_bits_table():
+    """BMP (U+0000～U+FFFF) のコードポイントごとの文字種ビットマスク表を作る。
+
+    連続したUnicode範囲はスライス代入でまとめて設定し、
+    範囲にならない日本語句読点・記号だけを1文字ずつ設定する。
+    特殊文字判定用のビットは、正規表現 _NON_SPECIAL がマッチする位置にまとめて設定する。
+    """
+    table = np.zeros(0x10000, dtype=np.uint16)
+    pure_jp = _BIT_PURE_JP | _BIT_JP_RELATED
+    for lo, hi, bits in (
+        (0x3040, 0x30A0, _BIT_HIRAGANA | pure_jp),  # HIRAGANA
+        (0x30A0, 0x3100, _BIT_KATAKANA_FULL | pure_jp),  # KATAKANA
+        (0xFF65, 0xFFA0, _BIT_KATAKANA_HALF | pure_jp),  # KATAKANA_HW
+        (0x4E00, 0xA000, _BIT_KANJI | pure_jp),  # KANJI_COMMON
+        (0x3400, 0x4DC0, _BIT_KANJI | pure_jp),  # KANJI_EXT_A
+        # KANJI_COMPAT (純粋日本語ではない)
+        (0xF900, 0xFB00, _BIT_KANJI | _BIT_JP_RELATED),
+        (0xFF01, 0xFF5F, _BIT_FULLWIDTH_ASCII | _BIT_JP_RELATED),
+        (ord("a"), ord("z") + 1, _BIT_BASIC_ENGLISH),
+        (ord("A"), ord("Z") + 1, _BIT_BASIC_ENGLISH),
+        (ord("0"), ord("9") + 1, _BIT_DIGIT),
+    ):
+        table[lo:hi] |= bits
+    for c in JP_PUNCT | JP_SYMBOLS_ETC:
+        table[ord(c)] |= _BIT_JP_PUNCT_SYMBOL | _BIT_JP_RELATED
+    bmp_chars = "".join(map(chr, range(0x10000)))
+    non_special = [m.start() for m in _NON_SPECIAL.finditer(bmp_chars)]
+    table[non_special] |= _BIT_NON_SPECIAL
+    return table
+
+
+_CHAR_BITS_BMP = _build_char_bits_table()
+
+# BMP外で判定対象となる文字種は漢字拡張B～F (U+20000～U+2FA1F) のみ。それ以外は0ビット
+_KANJI_EXT_B_TO_F_LO, _KANJI_EXT_B_TO_F_HI = 0x20000, 0x2FA20
+_BITS_KANJI_EXT_B_TO_F = _BIT_KANJI | _BIT_PURE_JP | _BIT_JP_RELATED
+
+# これ以下の長さのトークンは encode によるバッファ確保を避けて ord() で変換する
+_SHORT_TOKEN_LEN = 8
+
+
+def _token_cps(token):
+    """トークン文字列をコードポイント配列 (uint32) に変換する"""
+    if len(token) > _SHORT_TOKEN_LEN:
+        return np.frombuffer(token.encode("utf-32-le"), dtype=np.uint32)
+    return np.fromiter(map(ord, token), dtype=np.uint32, count=len(token))
+
+
+# --- ユーティリティ関数 (分類ロジック再現用ヘルパー) ---
+# 同じ文字列に対する計算結果を使い回すため、戻り値は不変型 (namedtuple / frozenset) とし lru_cache でキャッシュする
+_UTIL_CACHE_SIZE = 200_000
+
+_TokenFlags = collections.namedtuple(
+    "_TokenFlags",
+    [
+        "has_hiragana",
+        "has_katakana_full",
+        "has_katakana_half",
+        "has_kanji",
+        "has_jp_punct_symbol",
+        "has_fullwidth_ascii",
+        "has_basic_english",
+        "has_digit",
+        "all_pure_jp_script",
+        "all_basic_english",
+        "is_related_to_jp",
+        "is_special_pattern",
+    ],
+)
+
+
+@functools.lru_cache(maxsize=_UTIL_CACHE_SIZE)
+def _calculate_token_flags_util(decoded_token):
+    """トークン文字列から文字種フラグを計算する (ユーティリティ関数版)"""
+    flags = {
+        "has_hiragana": False,
+        "has_katakana_full": False,
+        "has_katakana_half": False,
+        "has_kanji": False,
+        "has_jp_punct_symbol": False,
+        "has_fullwidth_ascii": False,
+        "has_basic_english": False,
+        "has_digit": False,
+        "all_pure_jp_script": True,
+        "all_basic_english": True,
+        "is_related_to_jp": False,
+        "is_special_pattern": False,
+    }
+    if not decoded_token:
+        return _TokenFlags(**flags)
+    cp = _token_cps(decoded_token)
+    bits = np.where(cp < 0x10000, _CHAR_BITS_BMP[cp & 0xFFFF], 0)
+    if cp.max() >= _KANJI_EXT_B_TO_F_LO:
+        in_ext = (cp >= _KANJI_EXT_B_TO_F_LO) & (cp < _KANJI_EXT_B_TO_F_HI)
+        bits[in_ext] = _BITS_KANJI_EXT_B_TO_F
+    any_bits = int(np.bitwise_or.reduce(bits))
+    flags["has_hiragana"] = bool(any_bits & _BIT_HIRAGANA)
+    flags["has_katakana_full"] = bool(any_bits & _BIT_KATAKANA_FULL)
+    flags["has_katakana_half"] = bool(any_bits & _BIT_KATAKANA_HALF)
+    flags["has_kanji"] = bool(any_bits & _BIT_KANJI)
+    flags["has_jp_punct_symbol"] = bool(any_bits & _BIT_JP_PUNCT_SYMBOL)
+    flags["has_fullwidth_ascii"] = bool(any_bits & _BIT_FULLWIDTH_ASCII)
+    flags["has_basic_english"] = bool(any_bits & _BIT_BASIC_ENGLISH)
+    flags["has_digit"] = bool(any_bits & _BIT_DIGIT)
+    flags["all_pure_jp_script"] = bool((bits & _BIT_PURE_JP).all())
+    flags["all_basic_english"] = bool((bits & _BIT_BASIC_ENGLISH).all())
+    flags["is_related_to_jp"] = bool(any_bits & _BIT_JP_RELATED)
+    # 特殊文字パターン判定も同じビット列から求める (BMP外の文字を含む場合のみ文字列を再走査)
+    if cp.max() < 0x10000:
+        flags["is_special_pattern"] = not (any_bits & _BIT_NON_SPECIAL)
+    else:
+        flags["is_special_pattern"] = _is_special_fast(decoded_token)
+    return _TokenFlags(**flags)
+
+
+@functools.lru_cache(maxsize=_UTIL_CACHE_SIZE)
+def _calculate_expected_categories_util(decoded_token):
+    """分類ロジックに基づき、トークンが属すべきカテゴリのセットを計算する (ユーティリティ関数版)"""
+    if not decoded_token:
+        # 空文字列はどのカテゴリの条件にも該当しないため、未分類として集計される
+        return frozenset({"uncategorized"})
+    flags = _calculate_token_flags_util(decoded_token)
+    expected_cats = set()
+    if flags.is_related_to_jp:
+        expected_cats.add("contains_japanese")
+    if flags.has_hiragana:
+        expected_cats.add("contains_hiragana")
+    if flags.has_katakana_full:
+        expected_cats.add("contains_katakana_full")
+    if flags.has_katakana_half:
+        expected_cats.add("contains_katakana_half")
+    if flags.has_kanji:
+        expected_cats.add("contains_kanji")
+    if flags.has_jp_punct_symbol:
+        expected_cats.add("contains_jp_punct_symbol")
+    if flags.has_fullwidth_ascii:
+        expected_cats.add("contains_fullwidth_ascii")
+    if flags.all_pure_jp_script and (
+        flags.has_hiragana
+        or flags.has_katakana_full
+        or flags.has_katakana_half
+        or flags.has_kanji
+    ):
+        expected_cats.add("pure_japanese_script")
+    if flags.has_basic_english:
+        expected_cats.add("contains_basic_english")
+    if flags.all_basic_english and not flags.is_related_to_jp:
+        expected_cats.add("pure_english")
+    if flags.has_digit:
+        expected_cats.add("contains_digit")
+    is_sp_pattern = flags.is_special_pattern
+    if (
+        not flags.is_related_to_jp
+        and not flags.has_basic_english
+        and not flags.has_digit
+        and is_sp_pattern
+    ):
+        expected_cats.add("special_char_pattern")
+    if (
+        not flags.is_related_to_jp
+        and not flags.has_basic_english
+        and not flags.has_digit
+        and not is_sp_pattern
+    ):
+        expected_cats.add("uncategorized")
+    return frozenset(expected_cats)
+
+
+# ----- ヘルパー関数の単体テストクラス -----
+class HelperFunctionTests(unittest.TestCase):
+    def test_is_japanese_related_charの拡張ケース(self):
+        test_cases = [
+            ("あ", True),
+            ("ア", True),
+            ("漢", True),
+            ("ー", True),
+            ("ｶ", True),
+            ("ﾟ", True),
+            ("。", True),
+            ("　", True),
+            ("・", True),
+            ("￥", True),
+            ("「", True),
+            ("､", True),
+            ("Ａ", True),
+            ("ｂ", True),
+            ("０", True),
+            ("！", True),
+            ("～", True),
+            ("A", False),
+            ("1", False),
+            ("$", False),
+            (" ", False),
+            ("\n", False),
+            ("α", False),
+        ]
+        for char, expected in test_cases:
+            with self.subTest(char=char, expected=expected):
+                actual = is_japanese_related_char(char)
+                self.assertEqual(
+                    actual,
+                    expected,
+                    f"文字 '{char}' (U+{ord(char):04X}) is_japanese_related_char",
+                )
+
+    def test_is_pure_japanese_script_charの拡張ケース(self):
+        test_cases = [
+            ("あ", True),
+            ("ア", True),
+            ("漢", True),
+            ("ｶ", True),
+            ("ー", True),
+            ("･", True),
+            ("﨑", False),
+            ("。", False),
+            ("　", False),
+            ("Ａ", False),
+            ("1", False),
+            (" ", False),
+            ("\n", False),
+        ]
+        for char, expected in test_cases:
+            with self.subTest(char=char, expected=expected):
+                actual = is_pure_japanese_script_char(char)
+                self.assertEqual(
+                    actual,
+                    expected,
+                    f"文字 '{char}' (U+{ord(char):04X}) is_pure_japanese_script_char",
+                )
+
+    def test_is_special_char_patternの拡張ケース(self):
+        test_cases = [
+            ("!!!", True),
+            ("@#$", True),
+            ("&&&", True),
+            ("+-*/", True),
+            ("---", True),
+            ("===", True),
+            ("abc", False),
+            ("あいう", False),
+            ("123", False),
+            ("ＡＢＣ", False),
+            ("カタカナ", False),
+            ("半角ｶﾅ", False),
+            ("漢字", False),
+            (" ", False),
+            ("　", False),
+            ("a#$", False),
+            ("#あ$", False),
+            ("#1$", False),
+            ("#Ａ$", False),
+            ("", False),
+            ("「」", False),
+            (" ---", False),
+            (" #", False),
+            (" 🔥", False),
+        ]
+        for token, expected in test_cases:
+            with self.subTest(token=repr(token), expected=expected):
+                actual = is_special_char_pattern(token)
+                self.assertEqual(
+                    actual, expected, f"トークン {repr(token)} is_special_char_pattern"
+                )
+
+
+# ----- 分類ロジックの単体テスト -----
+# (説明, ポジティブ例, ネガティブ例, ポジティブ例の期待カテゴリ, ポジティブ例が含まれるべきでないカテゴリ,
+#  ネガティブ例が含まれるべきでないカテゴリ)
+CHARACTERISTIC_PATTERNS = [
+    (
+        "半角カタカナ",
+        "ﾃｽﾄ",
+        "テスト",
+        {"contains_japanese", "contains_katakana_half", "pure_japanese_script"},
+        {"contains_katakana_full", "pure_english"},
+        "contains_katakana_half",
+    ),
+    (
+        "全角英字",
+        "ＡＢＣ",
+        "ABC",
+        {"contains_japanese", "contains_fullwidth_ascii"},
+        {"pure_japanese_script", "pure_english"},
+        "contains_fullwidth_ascii",
+    ),
+    (
+        "全角数字",
+        "１２３",
+        "123",
+        {"contains_japanese", "contains_fullwidth_ascii"},
+        {"pure_japanese_script", "pure_english", "contains_digit"},
+        "contains_fullwidth_ascii",
+    ),
+    (
+        "全角記号",
+        "％＆！",
+        "%&!",
+        {
+            "contains_japanese",
+            "contains_fullwidth_ascii",
+            "contains_jp_punct_symbol",
+        },
+        {"pure_japanese_script", "pure_english"},
+        "contains_fullwidth_ascii",
+    ),
+    (
+        "純粋ひらがな",
+        "あいうえお",
+        "アイウエオ",
+        {"contains_japanese", "contains_hiragana", "pure_japanese_script"},
+        {"contains_katakana_full", "pure_english"},
+        "contains_hiragana",
+    ),
+    (
+        "純粋カタカナ(長音符含)",
+        "トークン",
+        "token",
+        {"contains_japanese", "contains_katakana_full", "pure_japanese_script"},
+        {"contains_hiragana", "pure_english"},
+        "contains_katakana_full",
+    ),
+    (
+        "純粋漢字",
+        "日本語",
+        "にほんご",
+        {"contains_japanese", "contains_kanji", "pure_japanese_script"},
+        {"contains_hiragana", "pure_english"},
+        "contains_kanji",
+    ),
+    (
+        "純粋英語",
+        "HelloWorld",
+        "ハローワールド",
+        {"contains_basic_english", "pure_english"},
+        {"contains_japanese"},
+        "pure_english",
+    ),
+    (
+        "特殊文字パターン",
+        "---",
+        "-abc-",
+        {"special_char_pattern"},
+        {"contains_japanese", "contains_basic_english", "contains_digit"},
+        "special_char_pattern",
+    ),
+    (
+        "半角カナ+英語",
+        "ﾃｽﾄABC",
+        "テストABC",
+        {
+            "contains_japanese",
+            "contains_katakana_half",
+            "contains_basic_english",
+        },
+        {"pure_japanese_script", "pure_english"},
+        "contains_katakana_half",
+    ),
+    (
+        "漢字+数字(半角)",
+        "東京1",
+        "Tokyo1",
+        {"contains_japanese", "contains_kanji", "contains_digit"},
+        {"pure_japanese_script", "pure_english"},
+        "contains_kanji",
+    ),
+    (
+        "空白のみ",
+        "   ",
+        "abc",
+        {"uncategorized"},
+        {"contains_japanese", "contains_basic_english", "special_char_pattern"},
+        "uncategorized",
+    ),
+]
+
+# 各パターンの分類結果はモジュール読み込み時に1度だけ計算し、パラメータ化された各テストで共有する
+_PATTERN_CATEGORIES = {
+    description: (
+        _calculate_expected_categories_util(positive_example),
+        (
+            _calculate_expected_categories_util(negative_example)
+            if negative_example
+            else None
+        ),
+    )
+    for description, positive_example, negative_example, *_ in CHARACTERISTIC_PATTERNS
+}
+
+
+@pytest.mark.parametrize(
+    "description, positive_example, negative_example, expected_cats_positive, excluded_cats_positive, neg_excluded_subcat",
+    CHARACTERISTIC_PATTERNS,
+    ids=[pattern[0] for pattern in CHARACTERISTIC_PATTERNS],
+)
+def test_characteristic_patterns_logic(
+    description,
+    positive_example,
+    negative_example,
+    expected_cats_positive,
+    excluded_cats_positive,
+    neg_excluded_subcat,
+):
+    """定義された特徴的なパターンについて、分類ロジックが正しく働くか検証する。"""
+    calculated_cats, calculated_cats_neg = _PATTERN_CATEGORIES[description]
+    logger.debug("検証: '%s' - ポジティブ例 %r", description, positive_example)
+    assert calculated_cats == expected_cats_positive, (
+        f"'{positive_example}' のカテゴリ不一致"
+    )
+    for excluded_cat in excluded_cats_positive:
+        assert excluded_cat not in calculated_cats, (
+            f"'{positive_example}' は '{excluded_cat}' に含まれるべきでない"
+        )
+    if negative_example and neg_excluded_subcat:
+        logger.debug("検証: '%s' - ネガティブ例 %r", description, negative_example)
+        assert neg_excluded_subcat not in calculated_cats_neg, (
+            f"ネガティブ例 '{negative_example}' はカテゴリ '{neg_excluded_subcat}' に含まれるべきでない"
+        )
+
+
+# 特殊文字パターン判定の基準実装 (1文字ずつの素朴な定義) で使う日本語関連文字の集合
+_JP_RELATED_CHARS = (
+    HIRAGANA
+    | KATAKANA
+    | KATAKANA_HW
+    | KANJI_COMMON
+    | KANJI_EXT_A
+    | KANJI_EXT_B_TO_F
+    | KANJI_COMPAT
+    | JP_PUNCT
+    | JP_SYMBOLS_ETC
+    | JP_FULLWIDTH_ASCII_PRINTABLE
+)
+
+
+def _is_special_reference(token):
+    """特殊文字パターンの定義どおりに1文字ずつ判定する基準実装 (正規表現や表を使わない)"""
+    return bool(token) and not any(
+        c.isalnum() or c.isspace() or c in _JP_RELATED_CHARS for c in token
+    )
+
+
+class LogicVerificationTests(unittest.TestCase):
+    def test_特殊文字パターン判定と基準実装の一致(self):
+        """is_special_char_pattern と _is_special_fast が、1文字ずつの基準実装と同じ結果を返すか検証する。"""
+        samples = [
+            "",
+            "!!!",
+            "@#$",
+            " ---",
+            "α",
+            "αβ!",
+            "＃",
+            "﨑",
+            "𠀀",
+            "🔥",
+            "_",
+            "__",
+            " ",
+            "!あ",
+            "!\u3000",
+            "#１",
+            "🔥𪚲",
+            "-\U00030000",
+        ]
+        samples += [chr(c) for c in range(0x20, 0x3100)]
+        samples += [chr(c) for c in range(0xF900, 0x10000, 7)]
+        samples += [chr(c) for c in range(0x1F000, 0x30100, 97)]
+        for token in samples:
+            expected = _is_special_reference(token)
+            with self.subTest(token=repr(token)):
+                self.assertEqual(
+                    is_special_char_pattern(token),
+                    expected,
+                    f"トークン {repr(token)} の is_special_char_pattern の判定が基準実装と不一致",
+                )
+                self.assertEqual(
+                    _is_special_fast(token),
+                    expected,
+                    f"トークン {repr(token)} の _is_special_fast の判定が基準実装と不一致",
+                )
+
+
+# ----- ネットワーク不要のスタブトークナイザーを使った単体テスト -----
+class _StubBackend:
+    """Fast版トークナイザーの backend_tokenizer の代わり (to_str のみ)"""
+
+    def __init__(self, vocab):
+        self._serialized = json.dumps(vocab, ensure_ascii=False)
+
+    def to_str(self):
+        return self._serialized
+
+
+class _StubTokenizer:
+    """
+    語彙リストの文字列をそのままデコード結果として返す最小限のトークナイザー。
+    batch_fail_ids を含むバッチの batch_decode と、decode_fail_ids の decode は例外を送出する。
+    backend_tokenizer.to_str() は語彙から作った文字列を返し、解析結果キャッシュのキーに使われる。
+    """
+
+    bos_token_id = 0
+    eos_token_id = 1
+    pad_token_id = 2
+    unk_token_id = cls_token_id = sep_token_id = mask_token_id = None
+
+    def __init__(self, vocab, batch_fail_ids=(), decode_fail_ids=()):
+        self.vocab = list(vocab)
+        self.vocab_size = len(self.vocab)
+        self.all_special_ids = [0, 1, 2]
+        self.batch_fail_ids = frozenset(batch_fail_ids)
+        self.decode_fail_ids = frozenset(decode_fail_ids)
+        self.backend_tokenizer = _StubBackend(self.vocab)
+
+    def decode(self, ids, clean_up_tokenization_spaces=False):
+        if any(i in self.decode_fail_ids for i in ids):
+            raise ValueError(f"decode failed: {ids}")
+        return "".join(self.vocab[i] for i in ids)
+
+    def batch_decode(self, sequences, clean_up_tokenization_spaces=False):
+        if any(i in self.batch_fail_ids for seq in sequences for i in seq):
+            raise ValueError("batch_decode failed")
+        return [self.decode(seq) for seq in sequences]
+
+
+# 各カテゴリに該当するトークンを含む小さな語彙 (0～2 は特殊トークン)
+STUB_VOCAB = [
+    "<s>",
+    "</s>",
+    "<pad>",
+    "hello",
+    "こんにちは",
+    "カタカナ",
+    "ｶﾀ",
+    "漢字",
+    "abc123",
+    "!!",
+    "",
+    "日本go",
+    "、",
+    " ",
+    "α",
+    "🔥",
+    "42",
+]
+
+
+def _build_reference_vocab(seed, alphabet, num_tokens, max_len):
+    """
+    alphabet の文字を組み合わせた語彙を作る (0～2 は特殊トークン)。
+    空文字列・同じ文字列の繰り返し・長いトークンも含める。
+    """
+    rng = random.Random(seed)
+    tokens = [
+        "".join(rng.choices(alphabet, k=rng.randint(1, max_len)))
+        for _ in range(num_tokens)
+    ]
+    tokens += [""] * 5
+    tokens += tokens[:200]
+    tokens += ["".join(rng.choices(alphabet, k=64)) for _ in range(20)]
+    rng.shuffle(tokens)
+    return ["<s>", "</s>", "<pad>"] + tokens
+
+
+def _reference_alphabet():
+    """各文字種の範囲の境界と内部の文字、範囲外の各種文字を集めた文字の一覧"""
+    rng = random.Random(SAMPLE_SEED)
+    cps = set()
+    for lo, hi, _ in token_analyzer_ja._CHAR_RANGES:
+        cps.update((lo - 1, lo, hi - 1, hi))
+        cps.update(rng.randrange(lo, hi) for _ in range(20))
+    cps.update(ord(c) for c in JP_PUNCT | JP_SYMBOLS_ETC)
+    cps.update(range(0x20, 0x7F))
+    cps.update(rng.randrange(0x80, 0x3040) for _ in range(100))
+    # 絵文字・拡張漢字B～F (U+20000～U+2FA1F) とその前後・文字種の表の範囲外 (U+30000 以降)
+    cps.update((0x1F525, 0x1F600, 0x1F1EF, 0x2A6D6, 0x2B740, 0x2FA1F, 0x2FFFF))
+    cps.update((0x30000, 0x31350, 0x3134A, 0xE0001, 0x10FFFF))
+    alphabet = [chr(c) for c in sorted(cps)]
+    alphabet += ["\t", "\n", "\u00a0", "\u0301", "_"]
+    return alphabet
+
+
+_REFERENCE_VOCABS = {
+    "全文字種": _build_reference_vocab(SAMPLE_SEED, _reference_alphabet(), 4000, 6),
+    # 全トークンがASCIIのみの場合は、1バイト単位で文字種の表を引く経路を通る
+    "ASCIIのみ": _build_reference_vocab(
+        SAMPLE_SEED, [chr(c) for c in range(128)], 2000, 6
+    ),
+}
+
+
+@pytest.mark.parametrize("vocab_name", list(_REFERENCE_VOCABS))
+def test_analyze_token_categories_全トークンの分類が基準実装と一致(
+    vocab_name, monkeypatch
+):
+    """
+    analyze_token_categories の分類結果が、各トークンごとに
+    _calculate_expected_categories_util (1トークンずつの基準実装) と一致するか検証する。
+    """
+    # 複数チャンクに分けてデコードされるよう、チャンクを小さくする
+    monkeypatch.setattr(token_analyzer_ja, "_DECODE_BATCH_SIZE", 1000)
+    vocab = _REFERENCE_VOCABS[vocab_name]
+
+    result = token_analyzer_ja.analyze_token_categories(
+        "stub", min_token_id=3, tokenizer=_StubTokenizer(vocab)
+    )
+
+    actual = collections.defaultdict(set)
+    for name, ids in result["token_ids"].items():
+        for tid in ids:
+            actual[tid].add(name)
+    mismatches = [
+        (tid, vocab[tid], sorted(actual[tid]), sorted(expected))
+        for tid in range(3, len(vocab))
+        if actual[tid] != (expected := _calculate_expected_categories_util(vocab[tid]))
+    ]
+    assert result["analysis_details"]["num_tokens_analyzed"] == len(vocab) - 3
+    assert not mismatches, f"分類不一致 {len(mismatches)} 件: {mismatches[:5]}"
+
+
+def test_decode_tokens_バッチ失敗時に1件ずつデコードする(monkeypatch):
+    """batch_decode に失敗したチャンクだけ1件ずつデコードし、失敗したIDのみをエラーとして数えるか検証する。"""
+    monkeypatch.setattr(token_analyzer_ja, "_DECODE_BATCH_SIZE", 4)
+    # ID 5 を含むチャンク (4～7) は一括デコードに失敗し、そのうち ID 6 は1件ずつでも失敗する
+    tokenizer = _StubTokenizer(STUB_VOCAB, batch_fail_ids={5}, decode_fail_ids={6})
+    token_ids = list(range(3, len(STUB_VOCAB)))
+
+    texts, error_count = token_analyzer_ja._decode_tokens(tokenizer, token_ids)
+
+    expected = [STUB_VOCAB[i] if i != 6 else "" for i in token_ids]
+    assert texts == expected
+    assert error_count == 1
+
+
+def test_analyze_token_categories_デコード失敗数の集計(monkeypatch):
+    """デコードに失敗したトークンだけが num_errors に数えられ、未分類に入るか検証する。"""
+    monkeypatch.setattr(token_analyzer_ja, "_DECODE_BATCH_SIZE", 4)
+    tokenizer = _StubTokenizer(STUB_VOCAB, batch_fail_ids={5, 12}, decode_fail_ids={6})
+
+    result = token_analyzer_ja.analyze_token_categories(
+        "stub", min_token_id=3, tokenizer=tokenizer
+    )
+
+    assert result["analysis_details"]["num_errors"] == 1
+    assert 6 in result["token_ids"]["uncategorized"]
+    # 一括デコードに失敗したが1件ずつでは成功したトークンは通常どおり分類される
+    assert 5 in result["token_ids"]["contains_katakana_full"]
+    assert 12 in result["token_ids"]["contains_jp_punct_symbol"]
+
+
+@pytest.mark.parametrize("min_token_id", [3, len(STUB_VOCAB)])
+def test_analyze_token_categories_ID一覧なしでも統計が同じ(min_token_id, capsys):
+    """include_token_ids=False の結果が、ID一覧を除けば通常の結果と同じ統計・表示になるか検証する。"""
+    tokenizer = _StubTokenizer(STUB_VOCAB)
+    with_ids = token_analyzer_ja.analyze_token_categories(
+        "stub", min_token_id=min_token_id, tokenizer=tokenizer
+    )
+    without_ids = token_analyzer_ja.analyze_token_categories(
+        "stub", min_token_id=min_token_id, tokenizer=tokenizer, include_token_ids=False
+    )
+
+    assert "token_ids" not in without_ids
+    assert without_ids == {k: v for k, v in with_ids.items() if k != "token_ids"}
+    assert list(without_ids["statistics"]) == list(with_ids["token_ids"])
+    assert without_ids["statistics"] == {
+        name: len(ids) for name, ids in with_ids["token_ids"].items()
+    }
+
+    # コンソールに表示される件数も一致する
+    token_analyzer_ja.print_analysis_summary(with_ids)
+    summary_with_ids = capsys.readouterr().out
+    token_analyzer_ja.print_analysis_summary(without_ids)
+    assert capsys.readouterr().out == summary_with_ids
+
+
+# 通常の分析結果の形 ("token_ids" が末尾) に、空リスト・非ASCIIのキーと値・入れ子の詳細を含めた例
+_JSON_WRITER_CASES = [
+    {
+        "model_id": "組織/モデル-日本語",
+        "vocab_size": 17,
+        "analysis_details": {
+            "min_token_id_analyzed": 3,
+            "excluded_special_ids": [0, 1, 2],
+            "メモ": {"説明": '「全角」と"引用符"\n改行', "空": {}, "空リスト": []},
+        },
+        "statistics": {"contains_japanese": 2, "未分類": 0},
+        "token_ids": {"contains_japanese": [4, 5], "未分類": [], "カテゴリ\t名": [7]},
+    },
+    {"token_ids": {"a": [1], "b": []}},
+    {"model_id": "m", "token_ids": {"empty": []}},
+    # 高速化の対象外 (json.dump にそのまま任せる形)
+    {"model_id": "m", "token_ids": {}},
+    {"token_ids": {"a": [1]}, "statistics": {"a": 1}},
+    {"model_id": "m", "token_ids": {"a": [1, True, "x"]}},
+    {},
+]
+
+
+@pytest.mark.parametrize("data", _JSON_WRITER_CASES)
+def test_write_analysis_json_標準のjson出力と一致(data):
+    """_write_analysis_json の出力が json.dumps(indent=2, ensure_ascii=False) と完全に一致するか検証する。"""
+    buf = io.StringIO()
+    token_analyzer_ja._write_analysis_json(data, buf)
+    assert buf.getvalue() == json.dumps(data, indent=2, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("use_orjson", [False, True])
+def test_save_analysis_results_保存形式(use_orjson, tmp_path, monkeypatch):
+    """orjson の有無にかかわらず、保存されたJSONが json.dumps(indent=2, ensure_ascii=False) と同じ内容か検証する。"""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(token_analyzer_ja, "orjson", None)
+    result = token_analyzer_ja.analyze_token_categories(
+        "org/stub-model", min_token_id=3, tokenizer=_StubTokenizer(STUB_VOCAB)
+    )
+
+    token_analyzer_ja.save_analysis_results(result, output_dir=str(tmp_path))
+
+    saved = (tmp_path / "token_analysis_jp_stub_model.json").read_text(encoding="utf-8")
+    assert saved == json.dumps(result, indent=2, ensure_ascii=False)
+
+
+# run_full_analysis がファイルに保存するカテゴリ (README の「カテゴリ別テキストファイル」)
+SAVED_CATEGORIES = [
+    "contains_japanese",
+    "pure_japanese_script",
+    "contains_hiragana",
+    "contains_katakana_full",
+    "contains_katakana_half",
+    "contains_kanji",
+    "contains_fullwidth_ascii",
+    "pure_english",
+    "special_char_pattern",
+    "uncategorized",
+]
+
+
+def _read_token_list_file(path):
+    """save_token_list が書き出した '<カテゴリ>_ids = [1,2,3]' 形式のファイルからIDのリストを読む"""
+    body = path.read_text(encoding="utf-8").strip()
+    return [int(x) for x in body.split("= [", 1)[1].rstrip("]").split(",")]
+
+
+def test_save_token_lists_combined_カテゴリ一覧をまとめて保存(tmp_path):
+    """まとめて保存したJSONのキーとID一覧が、分析結果の token_ids と一致するか検証する。"""
+    result = token_analyzer_ja.analyze_token_categories(
+        "org/stub-model", min_token_id=3, tokenizer=_StubTokenizer(STUB_VOCAB)
+    )
+    token_ids_by_category = result["token_ids"]
+
+    token_analyzer_ja.save_token_lists_combined(
+        token_ids_by_category, SAVED_CATEGORIES, str(tmp_path), "org/stub-model"
+    )
+
+    saved = json.loads(
+        (tmp_path / "categories_stub_model.json").read_text(encoding="utf-8")
+    )
+    assert saved["model_id"] == "org/stub-model"
+    assert list(saved["token_ids"]) == SAVED_CATEGORIES
+    for name in SAVED_CATEGORIES:
+        assert saved["token_ids"][name] == token_ids_by_category[name]
+
+
+@pytest.mark.parametrize("combined", [False, True])
+def test_run_full_analysis_カテゴリ別ファイルの出力(combined, tmp_path, monkeypatch):
+    """
+    通常はカテゴリごとのテキストファイルを書き出し (該当トークンが無いカテゴリはスキップ)、
+    combined_token_lists=True の場合は1つのJSONファイルだけを書き出すか検証する。
+    """
+    tokenizer = _StubTokenizer(STUB_VOCAB)
+    monkeypatch.setattr(token_analyzer_ja, "load_tokenizer", lambda model_id: tokenizer)
+    expected = token_analyzer_ja.analyze_token_categories(
+        "org/stub-model", min_token_id=3, tokenizer=tokenizer
+    )["token_ids"]
+    # スキップされるカテゴリと書き出されるカテゴリの両方があることを前提とする
+    assert not expected["contains_fullwidth_ascii"]
+    assert expected["contains_japanese"]
+
+    token_analyzer_ja.run_full_analysis(
+        "org/stub-model",
+        min_token_id=3,
+        output_dir=str(tmp_path),
+        use_cache=False,
+        combined_token_lists=combined,
+    )
+
+    combined_path = tmp_path / "categories_stub_model.json"
+    assert combined_path.exists() == combined
+    for name in SAVED_CATEGORIES:
+        path = tmp_path / f"{name}_stub_model.txt"
+        if combined or not expected[name]:
+            assert not path.exists(), f"{path.name} は書き出されないはず"
+        else:
+            assert _read_token_list_file(path) == expected[name]
+
+
+@pytest.fixture
+def counted_analysis(monkeypatch):
+    """
+    load_tokenizer がスタブを返すようにし、analyze_token_categories の呼び出し回数を数える。
+    fixture の値は [tokenizer] で、要素を差し替えるとトークナイザーを変更できる。
+    """
+    tokenizers = [_StubTokenizer(STUB_VOCAB)]
+    calls = []
+    original = token_analyzer_ja.analyze_token_categories
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(
+        token_analyzer_ja, "load_tokenizer", lambda model_id: tokenizers[0]
+    )
+    monkeypatch.setattr(token_analyzer_ja, "analyze_token_categories", counting)
+    return tokenizers, calls
+
+
+def _run_cached(tmp_path, min_token_id=3, use_cache=True):
+    token_analyzer_ja.run_full_analysis(
+        "org/stub-model",
+        min_token_id=min_token_id,
+        output_dir=str(tmp_path / "out"),
+        use_cache=use_cache,
+        cache_dir=str(tmp_path / "cache"),
+    )
+
+
+def _read_analysis_json(tmp_path):
+    path = tmp_path / "out" / "token_analysis_jp_stub_model.json"
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_解析結果キャッシュ_2回目はキャッシュを使う(tmp_path, counted_analysis):
+    """1回目は解析してキャッシュを保存し、2回目はキャッシュから同じ結果を出力する。"""
+    _, calls = counted_analysis
+    _run_cached(tmp_path)
+    first = _read_analysis_json(tmp_path)
+    assert len(calls) == 1
+    assert len(list((tmp_path / "cache").glob("*.pkl"))) == 1
+
+    _run_cached(tmp_path)
+    assert len(calls) == 1, "2回目はキャッシュを使い、解析し直さないはず"
+    assert _read_analysis_json(tmp_path) == first
+    # キャッシュは出力先ディレクトリに書き込まない
+    assert {p.suffix for p in (tmp_path / "out").iterdir()} == {".json", ".txt"}
+
+
+def test_解析結果キャッシュ_条件が変わると解析し直す(tmp_path, counted_analysis):
+    """min_token_id やトークナイザーの内容が変わった場合は、別のキャッシュとして解析し直す。"""
+    tokenizers, calls = counted_analysis
+    _run_cached(tmp_path, min_token_id=3)
+    _run_cached(tmp_path, min_token_id=4)
+    assert len(calls) == 2
+    details = _read_analysis_json(tmp_path)["analysis_details"]
+    assert details["min_token_id_analyzed"] == 4
+
+    tokenizers[0] = _StubTokenizer(STUB_VOCAB[:-1] + ["ひらがな"])
+    _run_cached(tmp_path, min_token_id=4)
+    assert len(calls) == 3
+    assert _read_analysis_json(tmp_path)["statistics"]["contains_hiragana"] == 2
+    assert len(list((tmp_path / "cache").glob("*.pkl"))) == 3
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        pytest.param(lambda data: b"not a pickle", id="不正なデータ"),
+        pytest.param(lambda data: data[: len(data) // 2], id="途中で切れたファイル"),
+        pytest.param(lambda data: pickle.dumps(["not", "a", "dict"]), id="辞書以外"),
+    ],
+)
+def test_解析結果キャッシュ_壊れたキャッシュは解析し直す(
+    corrupt, tmp_path, counted_analysis
+):
+    """読み込めないキャッシュは無視して解析し直し、正しいキャッシュで置き換える。"""
+    _, calls = counted_analysis
+    _run_cached(tmp_path)
+    expected = _read_analysis_json(tmp_path)
+    (cache_file,) = (tmp_path / "cache").glob("*.pkl")
+    cache_file.write_bytes(corrupt(cache_file.read_bytes()))
+
+    _run_cached(tmp_path)
+    assert len(calls) == 2
+    assert _read_analysis_json(tmp_path) == expected
+    with open(cache_file, "rb") as f:
+        assert pickle.load(f)["token_ids"] == expected["token_ids"]
+
+
+def test_解析結果キャッシュ_no_cacheでは読み書きしない(tmp_path, counted_analysis):
+    """use_cache=False (--no_cache) では既存のキャッシュを読まず、新しいキャッシュも書かない。"""
+    _, calls = counted_analysis
+    _run_cached(tmp_path, use_cache=False)
+    assert len(calls) == 1
+    assert not (tmp_path / "cache").exists()
+
+    _run_cached(tmp_path)
+    (cache_file,) = (tmp_path / "cache").glob("*.pkl")
+    mtime = cache_file.stat().st_mtime_ns
+    _run_cached(tmp_path, use_cache=False)
+    assert len(calls) == 3, "キャッシュがあっても解析し直すはず"
+    assert list((tmp_path / "cache").glob("*.pkl")) == [cache_file]
+    assert cache_file.stat().st_mtime_ns == mtime
+
+
+def test_解析結果キャッシュ_既定の保存先(tmp_path, monkeypatch, counted_analysis):
+    """cache_dir を指定しない場合は $XDG_CACHE_HOME/token_analyzer_ja に保存し、出力先には書かない。"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    token_analyzer_ja.run_full_analysis(
+        "org/stub-model", min_token_id=3, output_dir=str(tmp_path / "out")
+    )
+    assert len(list((tmp_path / "xdg" / "token_analyzer_ja").glob("*.pkl"))) == 1
+    assert not list((tmp_path / "out").glob("*.pkl"))
+
+
+# ----- メイン分析関数の統合テストクラス -----
+@pytest.fixture(scope="class")
+def analysis_setup(request, cached_analysis):
+    """統合テストクラスにトークナイザーと解析結果 (ディスクキャッシュ経由) を設定する"""
+    cls = request.cls
+    print(f"\n--- {cls.__name__} セットアップ開始 ---")
+    print(f"テスト対象モデル: {TARGET_MODEL_ID}")
+    # --- クラス変数を初期化 ---
+    cls.tokenizer = None
+    cls.result = None
+    cls.stats = {}
+    cls.token_ids_by_category = {}
+    cls.token_ids_by_category_sets = {}
+    cls.cat_mask = None
+    cls.details = {}
+    try:
+        # 解析側と同じキャッシュからロードし、解析時にトークナイザーを読み直さないようにする
+        cls.tokenizer = load_tokenizer(TARGET_MODEL_ID)
+        if cls.tokenizer is None:
+            raise RuntimeError(f"トークナイザーをロードできません: {TARGET_MODEL_ID}")
+        print(f"トークナイザー ({cls.tokenizer.__class__.__name__}) のロード完了")
+        print(f"トークン分析を開始します (min_token_id={MIN_TEST_TOKEN_ID})...")
+        cls.result = cached_analysis(TARGET_MODEL_ID, MIN_TEST_TOKEN_ID)
+        print("トークン分析完了")
+        # --- 結果が正常な場合のみ後続の変数を設定 ---
+        if cls.result is not None:
+            cls.stats = cls.result.get("statistics", {})
+            cls.token_ids_by_category = cls.result.get("token_ids", {})
+            cls.token_ids_by_category_sets = {
+                name: frozenset(ids) for name, ids in cls.token_ids_by_category.items()
+            }
+            # トークンIDを添字に、所属カテゴリをビットで持つ配列 (1回のロードで全カテゴリを参照できる)
+            cls.cat_mask = np.zeros(cls.result.get("vocab_size", 0), dtype=np.uint16)
+            for name, ids in cls.token_ids_by_category.items():
+                cls.cat_mask[np.asarray(ids, dtype=np.int64)] |= CATEGORY_BITS[name]
+            cls.details = cls.result.get(
+                "analysis_details", {}
+            )  # {} をデフォルトに
+            # analysis_details が空でないことも確認してからログ出力
+            if cls.details:
+                print(
+                    f"分析対象トークン数: {cls.details.get('num_tokens_analyzed', 0):,}"
+                )
+            else:
+                print("警告: analysis_details が結果に含まれていません。")
+                # details が必須であればここでエラーにするか検討
+                # raise RuntimeError("analysis_details が分析結果に含まれていません")
+        else:
+            raise RuntimeError("analyze_token_categories が None を返しました")
+    except Exception as e:
+        print(
+            f"\n****** セットアップ中に致命的なエラー ******\nエラータイプ: {type(e).__name__}\nエラーメッセージ: {e}"
+        )
+        import traceback
+
+        print(traceback.format_exc())
+        print("***********************************\n")
+        cls.result = None  # Ensure result is None on error
+    finally:
+        print(f"--- {cls.__name__} セットアップ完了 ---")
+
+
+@pytest.mark.usefixtures("analysis_setup")
+class AnalysisIntegrationTests(unittest.TestCase):
+    tokenizer = None
+    result = None
+    stats = {}
+    token_ids_by_category = {}
+    token_ids_by_category_sets = {}
+    cat_mask = None
+    details = {}
+
+    def test_分析結果の基本構造と必須キーの存在確認(self):
+        if self.result is None:
+            self.fail("セットアップ失敗")
+            return
+        self.assertEqual(self.result["model_id"], TARGET_MODEL_ID)
+        self.assertIsInstance(self.result["vocab_size"], int)
+        self.assertGreaterEqual(self.result["vocab_size"], 0)
+        self.assertIsInstance(self.result["num_special_tokens"], int)
+        self.assertGreaterEqual(self.result["num_special_tokens"], 0)
+        expected_top_keys = [
+            "model_id",
+            "vocab_size",
+            "num_special_tokens",
+            "analysis_details",
+            "statistics",
+            "token_ids",
+        ]
+        [self.assertIn(key, self.result) for key in expected_top_keys]
+        # --- details の存在とキーのチェックを修正 ---
+        self.assertIn(
+            "analysis_details", self.result, "analysis_details キーが結果にありません"
+        )
+        # self.details は setUpClass で {} に初期化される可能性があるため、None チェックは不要
+        self.assertIsInstance(
+            self.details, dict, "analysis_details が辞書ではありません"
+        )
+        # details が空でないことをチェック (setUpClass で None でないことが保証されていれば)
+        self.assertTrue(
+            self.details, "analysis_details が空の辞書です (分析失敗の可能性)"
+        )  # 空の場合は失敗させる
+
+        expected_detail_keys = [
+            "min_token_id_analyzed",
+            "max_token_id_analyzed",
+            "num_tokens_analyzed",
+            "num_errors",
+            "excluded_special_ids",
+        ]
+        for key in expected_detail_keys:
+            self.assertIn(key, self.details, f"details にキー '{key}' がありません")
+        self.assertIsInstance(self.details.get("excluded_special_ids", []), list)
+        # --- 修正ここまで ---
+        self.assertIsInstance(self.stats, dict)
+        self.assertIsInstance(self.token_ids_by_category, dict)
+        expected_category_keys = {
+            "contains_japanese",
+            "pure_japanese_script",
+            "pure_english",
+            "contains_hiragana",
+            "contains_katakana_full",
+            "contains_katakana_half",
+            "contains_kanji",
+            "contains_jp_punct_symbol",
+            "contains_fullwidth_ascii",
+            "contains_basic_english",
+            "contains_digit",
+            "special_char_pattern",
+            "uncategorized",
+        }
+        self.assertEqual(set(self.stats.keys()), expected_category_keys)
+        self.assertEqual(set(self.token_ids_by_category.keys()), expected_category_keys)
+        self.assertGreaterEqual(self.details.get("num_tokens_analyzed", -1), 0)
+        if self.details.get("num_tokens_analyzed", 0) == 0:
+            logging.warning("分析対象トークン数が0でした。")
+
+    def test_カテゴリ間の部分集合関係の検証(self):
+        if self.result is None:
+            self.fail("セットアップ失敗")
+            return
+
+        # カテゴリが欠けている場合は空集合として黙って通さず、KeyError で失敗させる
+        def check_subset(sub, super_):
+            sub_set = self.token_ids_by_category_sets[sub]
+            super_set = self.token_ids_by_category_sets[super_]
+            self.assertTrue(sub_set.issubset(super_set), f"'{sub}' ⊆ '{super_}'")
+
+        check_subset("pure_japanese_script", "contains_japanese")
+        check_subset("contains_hiragana", "contains_japanese")
+        check_subset("contains_katakana_full", "contains_japanese")
+        check_subset("contains_katakana_half", "contains_japanese")
+        check_subset("contains_kanji", "contains_japanese")
+        check_subset("contains_jp_punct_symbol", "contains_japanese")
+        check_subset("contains_fullwidth_ascii", "contains_japanese")
+        check_subset("pure_english", "contains_basic_english")
+        pure_jp_set = self.token_ids_by_category_sets["pure_japanese_script"]
+        jp_ps_set = self.token_ids_by_category_sets["contains_jp_punct_symbol"]
+        fw_ascii_set = self.token_ids_by_category_sets["contains_fullwidth_ascii"]
+        if pure_jp_set and jp_ps_set:
+            self.assertTrue(
+                pure_jp_set.isdisjoint(jp_ps_set - pure_jp_set),
+                "pure_jp と jp_punct_symbol(のみ) は排他",
+            )
+        if pure_jp_set and fw_ascii_set:
+            self.assertTrue(
+                pure_jp_set.isdisjoint(fw_ascii_set - pure_jp_set),
+                "pure_jp と fw_ascii(のみ) は排他",
+            )
+
+    def test_カテゴリ間の排他関係の検証(self):
+        if self.result is None:
+            self.fail("セットアップ失敗")
+            return
+
+        def check_disjoint(cat1, cat2):
+            self.assertIn(
+                cat1,
+                self.token_ids_by_category,
+                f"カテゴリ '{cat1}' が結果にありません",
+            )
+            self.assertIn(
+                cat2,
+                self.token_ids_by_category,
+                f"カテゴリ '{cat2}' が結果にありません",
+            )
+            pair_bits = CATEGORY_BITS[cat1] | CATEGORY_BITS[cat2]
+            common = np.flatnonzero((self.cat_mask & pair_bits) == pair_bits)
+            if common.size:
+                samples = common[:5].tolist()
+                msg = f"排他検証失敗: '{cat1}'∩'{cat2}'={common.size} 個共通\n サンプル:{samples}"
+                if self.tokenizer:
+                    try:
+                        decoded_samples = self.tokenizer.batch_decode(
+                            [[t] for t in samples],
+                            clean_up_tokenization_spaces=False,
+                        )
+                        decoded = [
+                            f"{t}:{repr(d)}" for t, d in zip(samples, decoded_samples)
+                        ]
+                        msg += f"\n デコード例:{decoded}"
+                    except Exception as e:
+                        msg += f"\n (デコードエラー:{e})"
+                self.fail(msg)
+
+        check_disjoint("pure_japanese_script", "pure_english")
+        check_disjoint("pure_japanese_script", "special_char_pattern")
+        check_disjoint("pure_english", "contains_japanese")
+        check_disjoint("pure_english", "special_char_pattern")
+        check_disjoint("special_char_pattern", "contains_japanese")
+        check_disjoint("special_char_pattern", "contains_basic_english")
+
+        # uncategorized と他の全カテゴリとの排他は、ビットマスク1回の比較でまとめて検証する
+        self.assertIn(
+            "uncategorized",
+            self.token_ids_by_category,
+            "カテゴリ 'uncategorized' が結果にありません",
+        )
+        uncategorized_bit = CATEGORY_BITS["uncategorized"]
+        overlap = ((self.cat_mask & uncategorized_bit) != 0) & (
+            (self.cat_mask & DEFINED_CATEGORY_BITS) != 0
+        )
+        if overlap.any():
+            # 失敗時のみ、どのカテゴリと重複したかを個別に特定してメッセージに含める
+            for cat in CATEGORY_NAMES:
+                if cat != "uncategorized":
+                    check_disjoint("uncategorized", cat)
+
+    def test_統計値の整合性検証(self):
+        if self.result is None:
+            self.fail("セットアップ失敗")
+            return
+        for name, count in self.stats.items():
+            self.assertEqual(
+                count,
+                len(self.token_ids_by_category.get(name, [])),
+                f"統計値不一致:{name}",
+            )
+        # uncategorized 以外のいずれかのカテゴリに属するIDの数を cat_mask から一括で数える
+        num_analyzed = self.details.get("num_tokens_analyzed", 0)
+        num_uncat = self.stats.get("uncategorized", 0)
+        num_cat_unique = int(np.count_nonzero(self.cat_mask & DEFINED_CATEGORY_BITS))
+        self.assertEqual(
+            num_analyzed,
+            num_cat_unique + num_uncat,
+            f"合計数不一致:分析={num_analyzed:,},分類済={num_cat_unique:,},未分類={num_uncat:,}",
+        )
+
+    def test_分類ロジックの一貫性検証_サンプル(self):
+        if self.result is None:
+            self.fail("セットアップ失敗")
+            return
+        if self.tokenizer is None:
+            self.fail("Tokenizer未ロード")
+            return
+        if self.details.get("num_tokens_analyzed", 0) == 0:
+            self.skipTest("分析対象なし")
+            return  # .get() 使用
+        # テストごとに乱数を初期化し、実行順や -k による選択に関係なく同じIDを検証する
+        rng = random.Random(SAMPLE_SEED)
+        sampled_ids = set()
+        cats_to_sample = [
+            "pure_japanese_script",
+            "pure_english",
+            "special_char_pattern",
+            "uncategorized",
+            "contains_katakana_half",
+            "contains_fullwidth_ascii",
+            "contains_jp_punct_symbol",
+            "contains_digit",
+        ]
+        for cat in cats_to_sample:
+            # 分析結果のIDリストをそのまま使い、集合からのリスト再構築を避ける
+            ids_cat = self.token_ids_by_category.get(cat, [])
+            if ids_cat:
+                k = min(len(ids_cat), MAX_SAMPLES_PER_CATEGORY)
+                sampled_ids.update(rng.sample(ids_cat, k))
+        final_ids = sorted(list(sampled_ids))
+        if len(final_ids) > TOTAL_SAMPLES_FOR_LOGIC_TEST:
+            final_ids = sorted(rng.sample(final_ids, TOTAL_SAMPLES_FOR_LOGIC_TEST))
+        if not final_ids:
+            self.skipTest("検証サンプルIDなし")
+            return
+        logger.debug("分類ロジック一貫性検証 (サンプルID数: %d)", len(final_ids))
+        try:
+            decoded_list = self.tokenizer.batch_decode(
+                [[tid] for tid in final_ids], clean_up_tokenization_spaces=False
+            )
+        except Exception as e:
+            self.fail(f"サンプルID {final_ids} のデコードエラー: {e}")
+            return
+        for tid, decoded in zip(final_ids, decoded_list):
+            with self.subTest(tid=tid, decoded=repr(decoded)):
+                expected = _calculate_expected_categories_util(decoded)
+                actual = _categories_from_mask(int(self.cat_mask[tid]))
+                self.assertSetEqual(
+                    actual, expected, f"ID {tid} ({repr(decoded)}) 分類ロジック不一致"
+                )
+
+    def test_partial_japanese_token_samples(self):
+        if self.result is None:
+            self.fail("セットアップ失敗")
+            return
+        if self.tokenizer is None:
+            self.fail("Tokenizer未ロード")
+            return
+        contains_jp = self.token_ids_by_category_sets.get(
+            "contains_japanese", frozenset()
+        )
+        pure_jp = self.token_ids_by_category_sets.get(
+            "pure_japanese_script", frozenset()
+        )
+        # contains_japanese かつ pure_japanese_script でないIDを cat_mask から直接取り出す
+        partial_mixed_ids = np.flatnonzero(
+            ((self.cat_mask & CATEGORY_BITS["contains_japanese"]) != 0)
+            & ((self.cat_mask & CATEGORY_BITS["pure_japanese_script"]) == 0)
+        ).tolist()
+        if not partial_mixed_ids:
+            self.skipTest("Partial/Mixed候補なし")
+            return
+        num_samples = min(len(partial_mixed_ids), TOTAL_SAMPLES_FOR_LOGIC_TEST)
+        rng = random.Random(SAMPLE_SEED)
+        sampled = sorted(rng.sample(partial_mixed_ids, num_samples))
+        logger.debug("Partial/Mixed日本語トークン検証 (サンプルID数: %d)", len(sampled))
+        try:
+            decoded_list = self.tokenizer.batch_decode(
+                [[tid] for tid in sampled], clean_up_tokenization_spaces=False
+            )
+        except Exception as e:
+            logger.warning("サンプルIDのデコードエラー (Partial/Mixed検証): %s", e)
+            self.skipTest("サンプルIDをデコードできませんでした")
+            return
+        for tid, decoded in zip(sampled, decoded_list):
+            with self.subTest(tid=tid, decoded=repr(decoded)):
+                self.assertIn(
+                    tid,
+                    contains_jp,
+                    f"ID {tid} ({repr(decoded)}) は contains_japanese に含まれるべき",
+                )
+                self.assertNotIn(
+                    tid,
+                    pure_jp,
+                    f"ID {tid} ({repr(decoded)}) は pure_japanese_script に含まれないべき",
+                )
+                has_jp_flag = any(is_japanese_related_char(c) for c in decoded)
+                self.assertTrue(
+                    has_jp_flag,
+                    f"ID {tid} ({repr(decoded)}) は日本語関連文字を含むべき",
+                )
+
+
+# --- テスト実行 ---
+# pytest-xdist 導入済みなら `python test_token_analyzer.py -n auto --dist=loadscope` でクラス単位に並列実行できる
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v", *sys.argv[1:]]))
@@ -12,12 +12,22 @@
 """
 
 import os
+import re
 import json
+import pickle
+import hashlib
+import time
 import logging
 import argparse
-from typing import Dict, List, Set, Any
+import functools
+from typing import Dict, List, Tuple, Any, Optional
+import numpy as np
 from tqdm import tqdm
-import transformers
+
+try:
+    import orjson
+except ImportError:  # orjson が無い環境では標準の json モジュールで保存する
+    orjson = None
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -26,51 +36,189 @@ logging.basicConfig(
 # =========================================================================
 # ここから先は日本語文字判定用のユニコード範囲を定義します。
 # Slackで挙がった話題をすべて含めるため、下記のように広範に設定しています。
+# 連続した範囲は (lo, hi) [lo 以上 hi 未満] の整数ペアで定義し、文字の集合はそこから作成します。
+# 解析本体はこの整数ペアを使って範囲比較・表引きで判定します。
 # =========================================================================
 
 # ひらがな (U+3040 ~ U+309F)
-HIRAGANA = set(chr(c) for c in range(0x3040, 0x30A0))
+HIRAGANA_RANGE = (0x3040, 0x30A0)
+HIRAGANA = frozenset(chr(c) for c in range(*HIRAGANA_RANGE))
 
 # 全角カタカナ (U+30A0 ~ U+30FF)
-KATAKANA = set(chr(c) for c in range(0x30A0, 0x3100))
+KATAKANA_RANGE = (0x30A0, 0x3100)
+KATAKANA = frozenset(chr(c) for c in range(*KATAKANA_RANGE))
 
 # 半角カタカナ (U+FF65 ~ U+FF9F)
-KATAKANA_HW = set(chr(c) for c in range(0xFF65, 0xFFA0))
+KATAKANA_HW_RANGE = (0xFF65, 0xFFA0)
+KATAKANA_HW = frozenset(chr(c) for c in range(*KATAKANA_HW_RANGE))
 
 # CJK統合漢字 (U+4E00 ~ U+9FFF)
-KANJI_COMMON = set(chr(c) for c in range(0x4E00, 0xA000))
+KANJI_COMMON_RANGE = (0x4E00, 0xA000)
+KANJI_COMMON = frozenset(chr(c) for c in range(*KANJI_COMMON_RANGE))
 
 # CJK統合漢字拡張A (U+3400 ~ U+4DBF)
-KANJI_EXT_A = set(chr(c) for c in range(0x3400, 0x4DC0))
+KANJI_EXT_A_RANGE = (0x3400, 0x4DC0)
+KANJI_EXT_A = frozenset(chr(c) for c in range(*KANJI_EXT_A_RANGE))
 
 # CJK統合漢字拡張B-F (U+20000 ~ U+2FA1F)
 # 本来は拡張B: 0x20000~0x2A6DF, C, D, E, F, 互換補助など複数範囲がありますが、
 # 簡易的にまとめて 0x20000 ~ 0x2FA1F とします。
-KANJI_EXT_B_TO_F = set(chr(c) for c in range(0x20000, 0x2FA20))
+KANJI_EXT_B_TO_F_RANGE = (0x20000, 0x2FA20)
+KANJI_EXT_B_TO_F = frozenset(chr(c) for c in range(*KANJI_EXT_B_TO_F_RANGE))
 
 # CJK互換漢字 (U+F900 ~ U+FAFF)
-KANJI_COMPAT = set(chr(c) for c in range(0xF900, 0xFB00))
+KANJI_COMPAT_RANGE = (0xF900, 0xFB00)
+KANJI_COMPAT = frozenset(chr(c) for c in range(*KANJI_COMPAT_RANGE))
 
 # 日本語でよく使われる句読点・記号 (全角・半角)
-JP_PUNCT = set("、。「」『』【】・（）：；？！｡｢｣､")
-JP_SYMBOLS_ETC = set("　〜・￥")
+JP_PUNCT = frozenset("、。「」『』【】・（）：；？！｡｢｣､")
+JP_SYMBOLS_ETC = frozenset("　〜・￥")
 
 # 全角ASCII印字可能文字 (U+FF01 ~ U+FF5E 程度)
-JP_FULLWIDTH_ASCII_PRINTABLE = set(chr(c) for c in range(0xFF01, 0xFF5F))
+JP_FULLWIDTH_ASCII_PRINTABLE_RANGE = (0xFF01, 0xFF5F)
+JP_FULLWIDTH_ASCII_PRINTABLE = frozenset(
+    chr(c) for c in range(*JP_FULLWIDTH_ASCII_PRINTABLE_RANGE)
+)
 
 # 全角数字 (U+FF10 ~ U+FF19)
-JP_FULLWIDTH_DIGITS = set(chr(c) for c in range(0xFF10, 0xFF1A))
+JP_FULLWIDTH_DIGITS_RANGE = (0xFF10, 0xFF1A)
+JP_FULLWIDTH_DIGITS = frozenset(chr(c) for c in range(*JP_FULLWIDTH_DIGITS_RANGE))
 
 # 全角英大文字 (U+FF21 ~ U+FF3A), 全角英小文字 (U+FF41 ~ U+FF5A)
-JP_FULLWIDTH_LATIN_UPPER = set(chr(c) for c in range(0xFF21, 0xFF3B))
-JP_FULLWIDTH_LATIN_LOWER = set(chr(c) for c in range(0xFF41, 0xFF5B))
+JP_FULLWIDTH_LATIN_UPPER_RANGE = (0xFF21, 0xFF3B)
+JP_FULLWIDTH_LATIN_UPPER = frozenset(
+    chr(c) for c in range(*JP_FULLWIDTH_LATIN_UPPER_RANGE)
+)
+JP_FULLWIDTH_LATIN_LOWER_RANGE = (0xFF41, 0xFF5B)
+JP_FULLWIDTH_LATIN_LOWER = frozenset(
+    chr(c) for c in range(*JP_FULLWIDTH_LATIN_LOWER_RANGE)
+)
 JP_FULLWIDTH_LATIN = JP_FULLWIDTH_LATIN_UPPER | JP_FULLWIDTH_LATIN_LOWER
 
 # 基本的な英語文字セット (ASCII a-z, A-Z)
-ENGLISH_LOWER = set(chr(c) for c in range(ord("a"), ord("z") + 1))
-ENGLISH_UPPER = set(chr(c) for c in range(ord("A"), ord("Z") + 1))
+ENGLISH_LOWER_RANGE = (ord("a"), ord("z") + 1)
+ENGLISH_LOWER = frozenset(chr(c) for c in range(*ENGLISH_LOWER_RANGE))
+ENGLISH_UPPER_RANGE = (ord("A"), ord("Z") + 1)
+ENGLISH_UPPER = frozenset(chr(c) for c in range(*ENGLISH_UPPER_RANGE))
 ENGLISH_BASIC = ENGLISH_LOWER | ENGLISH_UPPER
 
+# ASCII数字 (0-9)
+ASCII_DIGITS_RANGE = (ord("0"), ord("9") + 1)
+
+# 日本語関連文字 (is_japanese_related_char) 全体。1回の集合参照で判定するためにまとめておく
+JP_ANY = (
+    HIRAGANA
+    | KATAKANA
+    | KATAKANA_HW
+    | KANJI_COMMON
+    | KANJI_EXT_A
+    | KANJI_EXT_B_TO_F
+    | KANJI_COMPAT
+    | JP_PUNCT
+    | JP_SYMBOLS_ETC
+    | JP_FULLWIDTH_ASCII_PRINTABLE
+)
+
+# 純粋な日本語の書記体系 (is_pure_japanese_script_char)。互換漢字は含まない
+JP_PURE_SCRIPT = (
+    HIRAGANA | KATAKANA | KATAKANA_HW | KANJI_COMMON | KANJI_EXT_A | KANJI_EXT_B_TO_F
+)
+
+# =========================================================================
+# コードポイント単位の文字種判定 (範囲比較による高速版)
+# 上記の集合はいずれも連続したユニコード範囲なので、ハッシュ参照ではなく整数の大小比較で判定します。
+# =========================================================================
+
+# 文字種ビット
+_CHAR_HIRAGANA = 1 << 0
+_CHAR_KATAKANA_FULL = 1 << 1
+_CHAR_KATAKANA_HALF = 1 << 2
+_CHAR_KANJI = 1 << 3
+_CHAR_JP_PUNCT_SYMBOL = 1 << 4
+_CHAR_FULLWIDTH_ASCII = 1 << 5
+_CHAR_BASIC_ENGLISH = 1 << 6
+_CHAR_DIGIT = 1 << 7
+# ひらがな・カタカナ(全角/半角)・漢字 (互換漢字を除く)
+_CHAR_PURE_JP = 1 << 8
+# 英数字または空白 (str.isalnum() / str.isspace())。特殊文字パターンの判定に使用
+_CHAR_ALNUM_SPACE = 1 << 9
+# is_japanese_related_char に該当する文字種
+_CHAR_JP_RELATED = (
+    _CHAR_HIRAGANA
+    | _CHAR_KATAKANA_FULL
+    | _CHAR_KATAKANA_HALF
+    | _CHAR_KANJI
+    | _CHAR_JP_PUNCT_SYMBOL
+    | _CHAR_FULLWIDTH_ASCII
+)
+
+# 範囲にならない句読点・記号だけはコードポイントの集合で判定
+_JP_PUNCT_SYMBOL_CODEPOINTS = frozenset(ord(c) for c in JP_PUNCT | JP_SYMBOLS_ETC)
+
+# 文字種ごとのコードポイント範囲 [lo, hi) と設定するビット
+_CHAR_RANGES = (
+    (*HIRAGANA_RANGE, _CHAR_HIRAGANA | _CHAR_PURE_JP),
+    (*KATAKANA_RANGE, _CHAR_KATAKANA_FULL | _CHAR_PURE_JP),
+    (*KATAKANA_HW_RANGE, _CHAR_KATAKANA_HALF | _CHAR_PURE_JP),
+    (*KANJI_COMMON_RANGE, _CHAR_KANJI | _CHAR_PURE_JP),
+    (*KANJI_EXT_A_RANGE, _CHAR_KANJI | _CHAR_PURE_JP),
+    (*KANJI_EXT_B_TO_F_RANGE, _CHAR_KANJI | _CHAR_PURE_JP),
+    (*KANJI_COMPAT_RANGE, _CHAR_KANJI),  # 純粋日本語には含めない
+    # 全角数字・全角英字も全角ASCIIの範囲に含まれる
+    (*JP_FULLWIDTH_ASCII_PRINTABLE_RANGE, _CHAR_FULLWIDTH_ASCII),
+    (*ENGLISH_LOWER_RANGE, _CHAR_BASIC_ENGLISH),
+    (*ENGLISH_UPPER_RANGE, _CHAR_BASIC_ENGLISH),
+    (*ASCII_DIGITS_RANGE, _CHAR_DIGIT),
+)
+_JP_PUNCT_SYMBOL_ARRAY = np.array(sorted(_JP_PUNCT_SYMBOL_CODEPOINTS), dtype=np.uint32)
+
+
+# 文字種の表に収めるコードポイントの上限 (U+0000 ~ U+2FFFF)。拡張漢字B-F・互換漢字補助まで含む
+_CHAR_TABLE_SIZE = 0x30000
+
+
+@functools.lru_cache(maxsize=None)
+def _get_char_table() -> np.ndarray:
+    """
+    U+0000 ~ U+2FFFF の各コードポイントの文字種ビットマスクを並べた表を返します。
+    作成に時間がかかるため、import 時ではなく最初に文字種を判定するときに1回だけ作成します。
+    """
+    table = np.zeros(_CHAR_TABLE_SIZE, dtype=np.uint16)
+    for lo, hi, b in _CHAR_RANGES:
+        table[lo:hi] |= b
+    table[_JP_PUNCT_SYMBOL_ARRAY] |= _CHAR_JP_PUNCT_SYMBOL
+    # isalnum / isspace は範囲で表せないため、表の全文字について一度だけ判定して表に含める
+    alnum_space = np.fromiter(
+        (c.isalnum() or c.isspace() for c in map(chr, range(_CHAR_TABLE_SIZE))),
+        dtype=bool,
+        count=_CHAR_TABLE_SIZE,
+    )
+    table[alnum_space] |= _CHAR_ALNUM_SPACE
+    # 共有される表のため書き換えを禁止する
+    table.flags.writeable = False
+    return table
+
+
+def _classify_codepoints(cps: np.ndarray) -> np.ndarray:
+    """
+    コードポイント配列 (uint32) の各要素が該当する文字種をビットマスク (_CHAR_*) の配列で返します。
+    表の範囲内の文字は1回の参照で判定し、範囲外 (U+30000 以上) の文字は isalnum / isspace だけを個別に判定します。
+    """
+    # 表の末尾 U+2FFFF は非文字でビットを持たないため、範囲外の文字はいったんそこへ寄せる
+    bits = _get_char_table()[np.minimum(cps, _CHAR_TABLE_SIZE - 1)]
+    out_of_table = cps >= _CHAR_TABLE_SIZE
+    if out_of_table.any():
+        # 出現する範囲外の文字の種類ごとに1回だけ判定して展開する
+        uniq, inverse = np.unique(cps[out_of_table], return_inverse=True)
+        alnum_space = np.fromiter(
+            (c.isalnum() or c.isspace() for c in map(chr, uniq.tolist())),
+            dtype=bool,
+            count=len(uniq),
+        )
+        bits[out_of_table] = np.where(alnum_space[inverse], _CHAR_ALNUM_SPACE, 0)
+    return bits
+
+
 # =========================================================================
 # 日本語関連文字かどうかを判定するためのヘルパー関数
 # =========================================================================
@@ -81,22 +229,7 @@ def is_japanese_related_char(char: str) -> bool:
     文字が日本語の関連文字（ひらがな、カタカナ(全角/半角)、漢字(基本～拡張B-F, 互換)、
     全角英数字、全角記号、主要句読点など）に該当するかを判定します。
     """
-    if (
-        char in HIRAGANA
-        or char in KATAKANA
-        or char in KATAKANA_HW
-        or char in KANJI_COMMON
-        or char in KANJI_EXT_A
-        or char in KANJI_EXT_B_TO_F
-        or char in KANJI_COMPAT
-        or char in JP_PUNCT
-        or char in JP_SYMBOLS_ETC
-        or char in JP_FULLWIDTH_ASCII_PRINTABLE
-        or char in JP_FULLWIDTH_DIGITS
-        or char in JP_FULLWIDTH_LATIN
-    ):
-        return True
-    return False
+    return char in JP_ANY
 
 
 def is_pure_japanese_script_char(char: str) -> bool:
@@ -104,17 +237,26 @@ def is_pure_japanese_script_char(char: str) -> bool:
     文字が厳密に「日本語の書記体系（ひらがな、カタカナ(全角/半角)、漢字）」のみを構成するか判定。
     記号や全角英数字は含まない。
     """
-    if (
-        char in HIRAGANA
-        or char in KATAKANA
-        or char in KATAKANA_HW
-        or char in KANJI_COMMON
-        or char in KANJI_EXT_A
-        or char in KANJI_EXT_B_TO_F
-        # or char in KANJI_COMPAT
-    ):
-        return True
-    return False
+    return char in JP_PURE_SCRIPT
+
+
+# ASCII のうち英数字でも空白でもない文字 (日本語関連文字は ASCII に含まれない)
+_ASCII_SPECIAL_CHARS = "".join(
+    chr(c) for c in range(0x80) if not (chr(c).isalnum() or chr(c).isspace())
+)
+
+# 特殊文字とみなさない文字 (英数字・空白・日本語関連文字) のいずれかにマッチする正規表現。
+# [^\W_] は str.isalnum()、\s は str.isspace() と同じ文字に一致する。
+_NON_SPECIAL_RE = re.compile(
+    r"[^\W_]|\s|["
+    + "".join(
+        f"{chr(lo)}-{chr(hi - 1)}"
+        for lo, hi, bits in _CHAR_RANGES
+        if bits & _CHAR_JP_RELATED
+    )
+    + "".join(re.escape(c) for c in sorted(JP_PUNCT | JP_SYMBOLS_ETC))
+    + "]"
+)
 
 
 def is_special_char_pattern(token: str) -> bool:
@@ -125,41 +267,124 @@ def is_special_char_pattern(token: str) -> bool:
       - 日本語関連文字 (is_japanese_related_char)
       - 基本英語 (ENGLISH_BASIC)
     これらのいずれにも当てはまらない文字だけで構成されていれば True。
+    文字ごとのループは行わず、ASCIIのみのトークンは str.strip、それ以外は正規表現で判定します。
     """
     if not token:
         return False
-
-    for c in token:
-        if c.isalnum():
-            return False
-        if c.isspace():
-            return False
-        if c in ENGLISH_BASIC:
-            return False
-        if is_japanese_related_char(c):
-            return False
-    return True
+    if token.isascii():
+        # 全文字が「英数字でも空白でもないASCII文字」なら strip で空になる
+        return not token.strip(_ASCII_SPECIAL_CHARS)
+    return _NON_SPECIAL_RE.search(token) is None
 
 
 # =========================================================================
 # トークンの分析メインロジック
 # =========================================================================
 
+# 分析結果のカテゴリ (結果の辞書もこの順序で出力します)
+_CATEGORY_NAMES = (
+    "contains_japanese",
+    "pure_japanese_script",
+    "pure_english",
+    "contains_hiragana",
+    "contains_katakana_full",
+    "contains_katakana_half",
+    "contains_kanji",
+    "contains_jp_punct_symbol",
+    "contains_fullwidth_ascii",
+    "contains_basic_english",
+    "contains_digit",
+    "special_char_pattern",
+    "uncategorized",
+)
+# カテゴリごとのビット (トークンごとの所属カテゴリを uint16 のマスクで表す)
+_CATEGORY_BITS = {name: 1 << i for i, name in enumerate(_CATEGORY_NAMES)}
+
+
+# batch_decode 1回あたりのトークン数 (進捗表示と、失敗時に1件ずつデコードし直す範囲の単位)
+_DECODE_BATCH_SIZE = 8192
+
+
+def _decode_tokens(tokenizer, token_ids: List[int]) -> Tuple[List[str], int]:
+    """
+    トークンIDを1件ずつの文字列にデコードし、(デコード結果のリスト, エラー数) を返します。
+    _DECODE_BATCH_SIZE 件ごとに batch_decode でまとめて処理し、
+    失敗したバッチのみ1件ずつデコードします。デコードに失敗したトークンは空文字列とします。
+    """
+    texts: List[str] = []
+    error_count = 0
+    for start in tqdm(
+        range(0, len(token_ids), _DECODE_BATCH_SIZE),
+        desc="トークン解析中",
+        unit="batch",
+        mininterval=0.5,
+    ):
+        batch = token_ids[start : start + _DECODE_BATCH_SIZE]
+        try:
+            texts.extend(
+                tokenizer.batch_decode(
+                    [[tid] for tid in batch], clean_up_tokenization_spaces=False
+                )
+            )
+            continue
+        except Exception as e:
+            logging.warning("一括デコードに失敗したため、1件ずつデコードします: %s", e)
+
+        for token_id in batch:
+            try:
+                texts.append(
+                    tokenizer.decode([token_id], clean_up_tokenization_spaces=False)
+                )
+            except Exception as e:
+                error_count += 1
+                if error_count <= 20:
+                    logging.warning("トークンID %s の解析中にエラー: %s", token_id, e)
+                texts.append("")
+    return texts, error_count
+
+
+@functools.lru_cache(maxsize=4)
+def _get_tokenizer(model_id: str):
+    """
+    トークナイザーをロードし、モデルIDごとにキャッシュします (失敗時は例外となりキャッシュされません)。
+    """
+    # transformers は読み込みに時間がかかるため、トークナイザーが必要になった時点で import する
+    # (--help や引数エラーの場合に読み込まずに済む)
+    import transformers
 
-def analyze_token_categories(model_id: str, min_token_id: int = 0) -> Dict[str, Any]:
+    return transformers.AutoTokenizer.from_pretrained(model_id, trust_remote_code=True)
+
+
+def load_tokenizer(model_id: str):
+    """
+    指定モデルのトークナイザーをロードします。失敗した場合は None を返します。
+    同じモデルIDで再度呼ばれた場合はロード済みのトークナイザーを返します。
+    """
+    try:
+        return _get_tokenizer(model_id)
+    except Exception as e:
+        logging.error("トークナイザー読み込み失敗: %s", e)
+        return None
+
+
+def analyze_token_categories(
+    model_id: str,
+    min_token_id: int = 0,
+    tokenizer: Any = None,
+    include_token_ids: bool = True,
+) -> Dict[str, Any]:
     """
     指定モデルのトークナイザーをロードし、min_token_id 以上の通常トークンを解析して
     各種カテゴリに仕分けし、その結果を返す。
     特殊トークンは対象外。
+    ロード済みの tokenizer が渡された場合はそれを使用します。
+    include_token_ids が False の場合、カテゴリ別のトークンID一覧 ("token_ids") は作らず統計のみを返します。
     """
-    logging.info(f"分析開始: {model_id}")
-    try:
-        tokenizer = transformers.AutoTokenizer.from_pretrained(
-            model_id, trust_remote_code=True
-        )
-    except Exception as e:
-        logging.error(f"トークナイザー読み込み失敗: {e}")
-        return {}
+    logging.info("分析開始: %s", model_id)
+    if tokenizer is None:
+        tokenizer = load_tokenizer(model_id)
+        if tokenizer is None:
+            return {}
 
     vocab_size = tokenizer.vocab_size
     max_token_id = vocab_size - 1
@@ -177,36 +402,24 @@ def analyze_token_categories(model_id: str, min_token_id: int = 0) -> Dict[str,
     for sid in common_special_tokens:
         if sid is not None:
             special_ids.add(sid)
+    excluded_special_ids = sorted(special_ids)
 
-    logging.info(f"語彙サイズ: {vocab_size}")
-    logging.info(f"特殊トークン数: {len(special_ids)}")
-
-    categories: Dict[str, Set[int]] = {
-        "contains_japanese": set(),
-        "pure_japanese_script": set(),
-        "pure_english": set(),
-        "contains_hiragana": set(),
-        "contains_katakana_full": set(),
-        "contains_katakana_half": set(),
-        "contains_kanji": set(),
-        "contains_jp_punct_symbol": set(),
-        "contains_fullwidth_ascii": set(),
-        "contains_basic_english": set(),
-        "contains_digit": set(),
-        "special_char_pattern": set(),
-        "uncategorized": set(),
-    }
+    logging.info("語彙サイズ: %s", vocab_size)
+    logging.info("特殊トークン数: %s", len(special_ids))
 
-    targets = [
-        tid
-        for tid in range(vocab_size)
-        if (tid >= min_token_id and tid not in special_ids)
-    ]
+    # カテゴリごとに1ビットを割り当て、トークンIDを添字とするマスク配列に所属カテゴリを記録する
+    category_masks = np.zeros(vocab_size, dtype=np.uint16)
+
+    # 分析対象: min_token_id 以上で特殊トークンではないID (語彙外の特殊トークンIDは無視)
+    is_target = np.zeros(vocab_size, dtype=bool)
+    is_target[max(min_token_id, 0) :] = True
+    is_target[[sid for sid in special_ids if 0 <= sid < vocab_size]] = False
+    targets = np.flatnonzero(is_target).tolist()
     if not targets:
         logging.warning(
             "分析対象トークンがありません。min_token_idの設定を確認してください。"
         )
-        return {
+        empty_result = {
             "model_id": model_id,
             "vocab_size": vocab_size,
             "num_special_tokens": len(special_ids),
@@ -215,126 +428,123 @@ def analyze_token_categories(model_id: str, min_token_id: int = 0) -> Dict[str,
                 "max_token_id_analyzed": max_token_id,
                 "num_tokens_analyzed": 0,
                 "num_errors": 0,
-                "excluded_special_ids": sorted(list(special_ids)),
+                "excluded_special_ids": excluded_special_ids,
             },
-            "statistics": {k: 0 for k in categories},
-            "token_ids": {k: [] for k in categories},
+            "statistics": {k: 0 for k in _CATEGORY_NAMES},
         }
+        if include_token_ids:
+            empty_result["token_ids"] = {k: [] for k in _CATEGORY_NAMES}
+        return empty_result
+
+    # 各トークンをデコード (空文字列になるトークンはどのカテゴリにも入らず未分類となる)
+    start_time = time.perf_counter()
+    texts, error_count = _decode_tokens(tokenizer, targets)
+    logging.info(
+        "%s 個のトークンをデコードしました (%.1f秒)",
+        len(targets),
+        time.perf_counter() - start_time,
+    )
+    start_time = time.perf_counter()
+    decoded_ids: List[int] = []
+    decoded_texts: List[str] = []
+    for token_id, decoded in zip(targets, texts):
+        if decoded:
+            decoded_ids.append(token_id)
+            decoded_texts.append(decoded)
+
+    # 同じ文字列にデコードされるトークンは文字種も同じなので、異なる文字列ごとに1回だけ判定する
+    unique_index: Dict[str, int] = {}
+    text_index = np.fromiter(
+        (unique_index.setdefault(t, len(unique_index)) for t in decoded_texts),
+        dtype=np.int64,
+        count=len(decoded_texts),
+    )
+    unique_texts = list(unique_index)
+
+    # 全文字列の文字を1本のコードポイント配列につなげ、文字種ビットを一括で判定
+    joined = "".join(unique_texts)
+    if joined.isascii():
+        # ASCIIのみの語彙は1文字1バイトで変換でき、表の先頭128要素を直接参照すればよい
+        char_bits = _get_char_table()[
+            np.frombuffer(joined.encode("ascii"), dtype=np.uint8)
+        ]
+    else:
+        cps = np.frombuffer(
+            joined.encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+        )
+        char_bits = _classify_codepoints(cps)
+    lengths = np.fromiter(
+        map(len, unique_texts), dtype=np.int64, count=len(unique_texts)
+    )
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+
+    # 文字列ごとに文字種ビットの OR (いずれかの文字が該当) と AND (全文字が該当) を集計し、
+    # 各トークンへ展開する
+    any_bits = np.bitwise_or.reduceat(char_bits, starts)[text_index]
+    all_bits = np.bitwise_and.reduceat(char_bits, starts)[text_index]
+
+    # カテゴリ分類 (各トークンが該当するかの真偽値配列)
+    is_jp_related = (any_bits & _CHAR_JP_RELATED) != 0
+    has_jp_script = (
+        any_bits
+        & (_CHAR_HIRAGANA | _CHAR_KATAKANA_FULL | _CHAR_KATAKANA_HALF | _CHAR_KANJI)
+    ) != 0
+    has_basic_eng = (any_bits & _CHAR_BASIC_ENGLISH) != 0
+    has_digit_flag = (any_bits & _CHAR_DIGIT) != 0
+    category_flags = {
+        "contains_japanese": is_jp_related,
+        "pure_japanese_script": (
+            is_jp_related & has_jp_script & ((all_bits & _CHAR_PURE_JP) != 0)
+        ),
+        "pure_english": (
+            has_basic_eng & ((all_bits & _CHAR_BASIC_ENGLISH) != 0) & ~is_jp_related
+        ),
+        "contains_hiragana": (any_bits & _CHAR_HIRAGANA) != 0,
+        "contains_katakana_full": (any_bits & _CHAR_KATAKANA_FULL) != 0,
+        "contains_katakana_half": (any_bits & _CHAR_KATAKANA_HALF) != 0,
+        "contains_kanji": (any_bits & _CHAR_KANJI) != 0,
+        "contains_jp_punct_symbol": (any_bits & _CHAR_JP_PUNCT_SYMBOL) != 0,
+        "contains_fullwidth_ascii": (any_bits & _CHAR_FULLWIDTH_ASCII) != 0,
+        "contains_basic_english": has_basic_eng,
+        "contains_digit": has_digit_flag,
+    }
 
-    error_count = 0
-    for token_id in tqdm(targets, desc="トークン解析中", unit="token"):
-        try:
-            decoded = tokenizer.decode([token_id], clean_up_tokenization_spaces=False)
-            if not decoded:
-                continue
-
-            has_hira = False
-            has_kata_f = False
-            has_kata_h = False
-            has_kanji = False
-            has_jp_punc = False
-            has_fw_ascii = False
-            has_basic_eng = False
-            has_digit_flag = False
-
-            all_pure_jp = True
-            all_basic_eng = True
-
-            for ch in decoded:
-                # カテゴリ判定フラグ
-                if ch in HIRAGANA:
-                    has_hira = True
-                if ch in KATAKANA:
-                    has_kata_f = True
-                if ch in KATAKANA_HW:
-                    has_kata_h = True
-                if (
-                    ch in KANJI_COMMON
-                    or ch in KANJI_EXT_A
-                    or ch in KANJI_EXT_B_TO_F
-                    or ch in KANJI_COMPAT
-                ):
-                    has_kanji = True
-                if (ch in JP_PUNCT) or (ch in JP_SYMBOLS_ETC):
-                    has_jp_punc = True
-                if (
-                    ch in JP_FULLWIDTH_ASCII_PRINTABLE
-                    or ch in JP_FULLWIDTH_DIGITS
-                    or ch in JP_FULLWIDTH_LATIN
-                ):
-                    has_fw_ascii = True
-                if ch in ENGLISH_BASIC:
-                    has_basic_eng = True
-                if "0" <= ch <= "9":
-                    has_digit_flag = True
-
-                # 純粋な日本語だけで構成されているか
-                if not is_pure_japanese_script_char(ch):
-                    all_pure_jp = False
-
-                # 純粋な英語だけで構成されているか
-                if ch not in ENGLISH_BASIC:
-                    all_basic_eng = False
-
-            # カテゴリ分類
-            is_jp_related = (
-                has_hira
-                or has_kata_f
-                or has_kata_h
-                or has_kanji
-                or has_jp_punc
-                or has_fw_ascii
-            )
-            if is_jp_related:
-                categories["contains_japanese"].add(token_id)
-                if has_hira:
-                    categories["contains_hiragana"].add(token_id)
-                if has_kata_f:
-                    categories["contains_katakana_full"].add(token_id)
-                if has_kata_h:
-                    categories["contains_katakana_half"].add(token_id)
-                if has_kanji:
-                    categories["contains_kanji"].add(token_id)
-                if has_jp_punc:
-                    categories["contains_jp_punct_symbol"].add(token_id)
-                if has_fw_ascii:
-                    categories["contains_fullwidth_ascii"].add(token_id)
-
-                if all_pure_jp and (has_hira or has_kata_f or has_kata_h or has_kanji):
-                    categories["pure_japanese_script"].add(token_id)
-
-            if has_basic_eng:
-                categories["contains_basic_english"].add(token_id)
-                if all_basic_eng and (not is_jp_related):
-                    categories["pure_english"].add(token_id)
-
-            if has_digit_flag:
-                categories["contains_digit"].add(token_id)
-
-            # 特殊文字パターン
-            if (
-                not is_jp_related
-                and not has_basic_eng
-                and not has_digit_flag
-                and is_special_char_pattern(decoded)
-            ):
-                categories["special_char_pattern"].add(token_id)
-
-        except Exception as e:
-            error_count += 1
-            if error_count <= 20:
-                logging.warning(f"トークンID {token_id} の解析中にエラー: {e}")
-            continue
+    # 特殊文字パターン: 英数字・空白・日本語関連文字を1文字も含まないトークン
+    # (is_special_char_pattern と同じ判定。英語・数字は英数字に含まれる)
+    category_flags["special_char_pattern"] = (
+        any_bits & (_CHAR_ALNUM_SPACE | _CHAR_JP_RELATED)
+    ) == 0
+
+    # デコード済みトークンごとのカテゴリビットを組み立ててから、マスク配列へ1回で書き込む
+    token_bits = np.zeros(len(decoded_ids), dtype=np.uint16)
+    for cname, flags in category_flags.items():
+        np.bitwise_or(token_bits, _CATEGORY_BITS[cname], out=token_bits, where=flags)
+    category_masks[decoded_ids] = token_bits
+    logging.info(
+        "%s 個のトークンを分類しました (%.1f秒)",
+        len(targets),
+        time.perf_counter() - start_time,
+    )
 
-    # 未分類を特定
-    all_categorized = set()
-    for cname, cset in categories.items():
-        if cname == "uncategorized":
-            continue
-        all_categorized |= cset
+    # 未分類を特定 (分析対象のうち、どのカテゴリのビットも立っていないトークン)
+    is_uncategorized = is_target & (category_masks == 0)
 
-    uncategorized_set = set(targets) - all_categorized
-    categories["uncategorized"] = uncategorized_set
+    if include_token_ids:
+        # カテゴリごとのトークンID一覧 (flatnonzero の結果は昇順)
+        categories: Dict[str, List[int]] = {
+            cname: np.flatnonzero(category_masks & bit).tolist()
+            for cname, bit in _CATEGORY_BITS.items()
+        }
+        categories["uncategorized"] = np.flatnonzero(is_uncategorized).tolist()
+        statistics = {k: len(v) for k, v in categories.items()}
+    else:
+        # ID一覧が不要な場合は、リストを作らずに件数だけを数える
+        statistics = {
+            cname: int(np.count_nonzero(category_masks & bit))
+            for cname, bit in _CATEGORY_BITS.items()
+        }
+        statistics["uncategorized"] = int(np.count_nonzero(is_uncategorized))
 
     # 結果整理
     analysis_result = {
@@ -346,11 +556,12 @@ def analyze_token_categories(model_id: str, min_token_id: int = 0) -> Dict[str,
             "max_token_id_analyzed": max_token_id,
             "num_tokens_analyzed": len(targets),
             "num_errors": error_count,
-            "excluded_special_ids": sorted(list(special_ids)),
+            "excluded_special_ids": excluded_special_ids,
         },
-        "statistics": {k: len(v) for k, v in categories.items()},
-        "token_ids": {k: sorted(list(v)) for k, v in categories.items()},
+        "statistics": statistics,
     }
+    if include_token_ids:
+        analysis_result["token_ids"] = categories
     return analysis_result
 
 
@@ -359,17 +570,83 @@ def analyze_token_categories(model_id: str, min_token_id: int = 0) -> Dict[str,
 # =========================================================================
 
 
+def _write_analysis_json(analysis_result: Dict[str, Any], f) -> None:
+    """
+    分析結果を json.dump(ensure_ascii=False, indent=2) と同じ形式でファイルへ書き出します (orjson が無い場合用)。
+    容量の大半を占める "token_ids" はカテゴリごとに str.join で整形して逐次書き込み、
+    標準の json エンコーダーで整数を1個ずつ処理するのを避けます。
+    """
+    token_ids = analysis_result.get("token_ids")
+    # "token_ids" が末尾にあり、各カテゴリが int のリストである通常の分析結果だけを高速に書き出す
+    # (それ以外の形は json.dump にそのまま任せる)
+    if (
+        not isinstance(token_ids, dict)
+        or not token_ids
+        or next(reversed(analysis_result)) != "token_ids"
+        or not all(
+            isinstance(ids, list) and all(type(i) is int for i in ids)
+            for ids in token_ids.values()
+        )
+    ):
+        json.dump(analysis_result, f, ensure_ascii=False, indent=2)
+        return
+
+    # "token_ids" 以外の部分を通常どおり整形し、閉じ括弧 "\n}" の手前に "token_ids" を追記する
+    rest = {k: v for k, v in analysis_result.items() if k != "token_ids"}
+    if rest:
+        head = json.dumps(rest, ensure_ascii=False, indent=2)
+        if not head.endswith("\n}"):
+            json.dump(analysis_result, f, ensure_ascii=False, indent=2)
+            return
+        f.write(head[: -len("\n}")])
+        f.write(',\n  "token_ids": {')
+    else:
+        f.write('{\n  "token_ids": {')
+    for i, (name, ids) in enumerate(token_ids.items()):
+        f.write(",\n    " if i else "\n    ")
+        f.write(json.dumps(name, ensure_ascii=False))
+        if len(ids):
+            f.write(": [\n      ")
+            f.write(",\n      ".join(map(str, ids)))
+            f.write("\n    ]")
+        else:
+            f.write(": []")
+    f.write("\n  }\n}")
+
+
+def _dump_json(obj: Dict[str, Any], output_path: str) -> None:
+    """
+    辞書を json.dump(ensure_ascii=False, indent=2) と同じ形式でファイルに保存します。
+    orjson があればそれを使い、無ければ _write_analysis_json で書き出します。
+    """
+    if orjson is not None:
+        # orjson は json.dump(ensure_ascii=False, indent=2) と同じ形式を高速に出力できる
+        with open(output_path, "wb") as f:
+            f.write(
+                orjson.dumps(
+                    obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                )
+            )
+    else:
+        with open(output_path, "w", encoding="utf-8") as f:
+            _write_analysis_json(obj, f)
+
+
 def save_analysis_results(
     analysis_result: Dict[str, Any],
     output_dir: str = "token_analysis_output",
     base_filename: str = "token_analysis_jp",
+    include_token_ids: bool = True,
 ):
     """
     JSONファイルとして分析結果を保存します。
+    include_token_ids が False の場合、カテゴリ別のトークンID一覧を除いて統計のみを保存します。
     """
     if not analysis_result:
         logging.error("分析結果がありません。保存をスキップします。")
         return
+    if not include_token_ids:
+        analysis_result = {k: v for k, v in analysis_result.items() if k != "token_ids"}
     try:
         os.makedirs(output_dir, exist_ok=True)
         model_name_part = (
@@ -380,11 +657,10 @@ def save_analysis_results(
         output_path = os.path.join(
             output_dir, f"{base_filename}_{model_name_part}.json"
         )
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(analysis_result, f, ensure_ascii=False, indent=2)
-        logging.info(f"JSON保存完了: {output_path}")
+        _dump_json(analysis_result, output_path)
+        logging.info("JSON保存完了: %s", output_path)
     except Exception as e:
-        logging.error(f"JSON保存中にエラーが発生: {e}")
+        logging.error("JSON保存中にエラーが発生: %s", e)
 
 
 def save_token_list(
@@ -395,7 +671,7 @@ def save_token_list(
     """
     if not token_ids:
         logging.info(
-            f"'{category_name}' に該当トークンがありません。保存をスキップします。"
+            "'%s' に該当トークンがありません。保存をスキップします。", category_name
         )
         return
     try:
@@ -407,10 +683,41 @@ def save_token_list(
             id_str = ",".join(str(i) for i in token_ids)
             f.write(f"{category_name}_ids = [{id_str}]\n")
         logging.info(
-            f"{len(token_ids)} 個の'{category_name}'トークンIDを保存しました: {outpath}"
+            "%s 個の'%s'トークンIDを保存しました: %s",
+            len(token_ids),
+            category_name,
+            outpath,
         )
     except Exception as e:
-        logging.error(f"'{category_name}'トークンIDリストの保存中にエラー: {e}")
+        logging.error("'%s'トークンIDリストの保存中にエラー: %s", category_name, e)
+
+
+def save_token_lists_combined(
+    token_ids_map: Dict[str, List[int]],
+    category_names: List[str],
+    output_dir: str,
+    model_id: str,
+):
+    """
+    指定カテゴリのトークンID一覧を、カテゴリごとのテキストファイルではなく
+    1つのJSONファイル (categories_<モデル名>.json) にまとめて書き出します。
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        model_name_part = os.path.basename(model_id).replace("/", "_").replace("-", "_")
+        outpath = os.path.join(output_dir, f"categories_{model_name_part}.json")
+        payload = {
+            "model_id": model_id,
+            "token_ids": {name: token_ids_map[name] for name in category_names},
+        }
+        _dump_json(payload, outpath)
+        logging.info(
+            "%s カテゴリのトークンIDをまとめて保存しました: %s",
+            len(category_names),
+            outpath,
+        )
+    except Exception as e:
+        logging.error("カテゴリ別トークンIDの保存中にエラー: %s", e)
 
 
 def print_analysis_summary(analysis_result: Dict[str, Any]):
@@ -448,10 +755,10 @@ def print_analysis_summary(analysis_result: Dict[str, Any]):
 
 
 def print_example_tokens(
-    model_id: str, category_name: str, token_ids: List[int], max_tokens: int = 10
+    tokenizer: Any, category_name: str, token_ids: List[int], max_tokens: int = 10
 ):
     """
-    指定カテゴリのトークンIDを数件サンプル表示します。
+    指定カテゴリのトークンIDを、ロード済みのトークナイザーでデコードして数件サンプル表示します。
     """
     if not token_ids:
         print(f"\n--- {category_name} のトークン例 ---")
@@ -459,12 +766,22 @@ def print_example_tokens(
         return
 
     print(f"\n--- {category_name} のトークン例 (最大{max_tokens}件) ---")
-    tokenizer = transformers.AutoTokenizer.from_pretrained(
-        model_id, trust_remote_code=True
-    )
-    for tid in token_ids[:max_tokens]:
+    shown_ids = token_ids[:max_tokens]
+    try:
+        # 表示する分をまとめて1回でデコード
+        texts = tokenizer.batch_decode(
+            [[tid] for tid in shown_ids], clean_up_tokenization_spaces=False
+        )
+    except Exception:
+        # 失敗した場合は1件ずつデコードし、失敗したトークンだけをエラー表示する
+        texts = None
+    for i, tid in enumerate(shown_ids):
         try:
-            txt = tokenizer.decode([tid], clean_up_tokenization_spaces=False)
+            txt = (
+                texts[i]
+                if texts is not None
+                else tokenizer.decode([tid], clean_up_tokenization_spaces=False)
+            )
             print(f"  ID: {tid:<6d} | Token: {repr(txt)}")
         except Exception as e:
             print(f"  ID: {tid:<6d} | デコード失敗: {e}")
@@ -475,28 +792,122 @@ def print_example_tokens(
 # =========================================================================
 
 
+def _default_cache_dir() -> str:
+    """
+    解析結果キャッシュの既定の保存先を返します。
+    出力先ディレクトリを汚さないよう、ユーザーのキャッシュディレクトリ
+    ($XDG_CACHE_HOME、未設定なら ~/.cache) 配下の token_analyzer_ja を使います。
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "token_analyzer_ja")
+
+
+def _analysis_cache_path(
+    tokenizer: Any, model_id: str, min_token_id: int, cache_dir: str
+) -> Optional[str]:
+    """
+    解析結果キャッシュのファイルパスを返します。
+    キーには (model_id, min_token_id, トークナイザーの内容, 特殊トークン, 本スクリプトの更新時刻) を用い、
+    いずれかが変われば別のキャッシュとなります。
+    トークナイザーの内容を取得できない場合 (Fast版以外) は None を返し、キャッシュを使用しません。
+    """
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is None:
+        return None
+    h = hashlib.sha256()
+    h.update(
+        f"{model_id}|{min_token_id}|{os.path.getmtime(__file__)}|"
+        f"{tokenizer.vocab_size}|{sorted(tokenizer.all_special_ids)}|".encode("utf-8")
+    )
+    h.update(backend.to_str().encode("utf-8"))
+    return os.path.join(cache_dir, f"analysis_{h.hexdigest()[:16]}.pkl")
+
+
+def _load_analysis_cache(cache_path: str) -> Optional[Dict[str, Any]]:
+    """
+    保存済みの解析結果を読み込みます。存在しない・読み込めない・内容が解析結果でない場合は None を返します。
+    """
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, "rb") as f:
+            result = pickle.load(f)
+    except Exception as e:
+        logging.warning("解析結果キャッシュの読み込みに失敗しました: %s", e)
+        return None
+    if not isinstance(result, dict) or "token_ids" not in result:
+        logging.warning(
+            "解析結果キャッシュの内容が不正なため無視します: %s", cache_path
+        )
+        return None
+    logging.info("キャッシュ済みの解析結果を使用します: %s", cache_path)
+    return result
+
+
+def _save_analysis_cache(analysis_result: Dict[str, Any], cache_path: str):
+    """
+    解析結果をキャッシュとして保存します。書き込み途中のファイルを読まないよう、一時ファイル経由で置き換えます。
+    """
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(analysis_result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logging.warning("解析結果キャッシュの保存に失敗しました: %s", e)
+
+
 def run_full_analysis(
-    model_id: str, min_token_id: int = 0, output_dir: str = "token_analysis_output"
+    model_id: str,
+    min_token_id: int = 0,
+    output_dir: str = "token_analysis_output",
+    include_token_ids: bool = True,
+    use_cache: bool = True,
+    combined_token_lists: bool = False,
+    cache_dir: Optional[str] = None,
 ):
     """
     トークン解析のフルプロセス:
-      1) 解析実行
-      2) JSON結果保存
-      3) カテゴリ別トークンIDリスト保存
+      1) 解析実行 (use_cache が True の場合、同じ条件の解析結果が cache_dir にあれば再利用。
+         cache_dir が None の場合はユーザーのキャッシュディレクトリを使う)
+      2) JSON結果保存 (include_token_ids が False の場合はトークンID一覧を除く)
+      3) カテゴリ別トークンIDリスト保存 (combined_token_lists が True の場合は1つのJSONファイルにまとめる)
       4) 統計表示
       5) 例示表示
     """
     logging.info("=== トークン解析開始 ===")
-    logging.info(f"モデルID: {model_id}")
-    logging.info(f"最小トークンID: {min_token_id}")
-    logging.info(f"出力先ディレクトリ: {output_dir}")
-
-    result = analyze_token_categories(model_id, min_token_id)
-    if not result:
-        logging.error("解析結果が空です。処理を終了します。")
+    logging.info("モデルID: %s", model_id)
+    logging.info("最小トークンID: %s", min_token_id)
+    logging.info("出力先ディレクトリ: %s", output_dir)
+
+    # トークナイザーは1回だけロードし、解析と例示表示で使い回す
+    tokenizer = load_tokenizer(model_id)
+    if tokenizer is None:
+        logging.error("トークナイザーを読み込めないため、処理を終了します。")
         return
 
-    save_analysis_results(result, output_dir=output_dir)
+    cache_path = (
+        _analysis_cache_path(
+            tokenizer, model_id, min_token_id, cache_dir or _default_cache_dir()
+        )
+        if use_cache
+        else None
+    )
+    result = _load_analysis_cache(cache_path) if cache_path else None
+    if result is None:
+        result = analyze_token_categories(model_id, min_token_id, tokenizer=tokenizer)
+        if not result:
+            logging.error("解析結果が空です。処理を終了します。")
+            return
+        if cache_path:
+            _save_analysis_cache(result, cache_path)
+
+    save_analysis_results(
+        result, output_dir=output_dir, include_token_ids=include_token_ids
+    )
 
     token_ids_map = result["token_ids"]
     categories_to_save = [
@@ -511,8 +922,13 @@ def run_full_analysis(
         "special_char_pattern",
         "uncategorized",
     ]
-    for cat in categories_to_save:
-        save_token_list(token_ids_map[cat], cat, output_dir, result["model_id"])
+    if combined_token_lists:
+        save_token_lists_combined(
+            token_ids_map, categories_to_save, output_dir, result["model_id"]
+        )
+    else:
+        for cat in categories_to_save:
+            save_token_list(token_ids_map[cat], cat, output_dir, result["model_id"])
 
     print_analysis_summary(result)
 
@@ -525,7 +941,7 @@ def run_full_analysis(
         ("pure_english", 10),
     ]
     for cat_name, max_show in example_targets:
-        print_example_tokens(model_id, cat_name, token_ids_map[cat_name], max_show)
+        print_example_tokens(tokenizer, cat_name, token_ids_map[cat_name], max_show)
 
     logging.info("=== トークン解析完了 ===")
 
@@ -560,14 +976,46 @@ def main():
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
         help="ログ出力レベル",
     )
+    parser.add_argument(
+        "--no_token_ids",
+        action="store_true",
+        help=(
+            "JSONにカテゴリ別のトークンID一覧を含めず、統計情報のみを保存する"
+            " (JSONの内容だけが変わる。カテゴリ別ファイルと例示表示にID一覧を使うため、解析は通常どおり行う)"
+        ),
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="解析結果キャッシュを読み書きせずに解析し直す",
+    )
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        default=None,
+        help="解析結果キャッシュの保存先 (デフォルト: $XDG_CACHE_HOME/token_analyzer_ja または ~/.cache/token_analyzer_ja)",
+    )
+    parser.add_argument(
+        "--combined_token_lists",
+        action="store_true",
+        help="カテゴリ別トークンIDをカテゴリごとのテキストファイルではなく1つのJSONファイルにまとめて保存する",
+    )
     args = parser.parse_args()
 
+    # 以降のログがすべて指定レベルに従うよう、最初にログレベルを設定する
     logging.getLogger().setLevel(args.log_level.upper())
 
+    # Rust実装のトークナイザーが batch_decode を並列処理できるようにする (明示的な指定があればそれを優先)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
     run_full_analysis(
         model_id=args.model_id,
         min_token_id=args.min_token_id,
         output_dir=args.output_dir,
+        include_token_ids=not args.no_token_ids,
+        use_cache=not args.no_cache,
+        combined_token_lists=args.combined_token_lists,
+        cache_dir=args.cache_dir,
     )
 
 